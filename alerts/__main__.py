@@ -0,0 +1,58 @@
+import argparse
+import asyncio
+import time
+
+from alerts.rules import KINDS, Alert, Engine, Rule
+from alerts.sinks import FileSink, Sink, WebhookSink
+from models.live import Selection, StreamParser
+from stream import source
+
+SECTIONS: Selection = {
+    "games": frozenset({"schedule"}),
+}
+
+
+async def deliver(alerts: "asyncio.Queue[Alert]", sinks: list[Sink]) -> None:
+    """Hand alerts to the sinks off the event loop, so a slow one can't hold up the stream"""
+    while True:
+        alert = await alerts.get()
+        for sink in sinks:
+            await asyncio.to_thread(sink.send, alert)
+        alerts.task_done()
+
+
+async def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Send alerts for what happens in live Blaseball games")
+    arg_parser.add_argument(
+        "-r", "--rule", dest="rules", type=Rule.parse, action="append", required=True,
+        help=f"What to alert on, as kind or kind:team, where kind is one of {', '.join(KINDS)}",
+    )
+    arg_parser.add_argument("--file", action="append", default=[], help="Append alerts to this file, or - for stdout (the default)")
+    arg_parser.add_argument("--webhook", action="append", default=[], help="POST alerts to this URL")
+    source.add_arguments(arg_parser)
+    args = arg_parser.parse_args()
+
+    sinks: list[Sink] = [FileSink(path) for path in args.file]
+    sinks.extend(WebhookSink(url) for url in args.webhook)
+    if not sinks:
+        sinks.append(FileSink("-"))
+    engine = Engine(args.rules)
+    parser = StreamParser(SECTIONS, trusted=bool(args.hub))
+
+    alerts: "asyncio.Queue[Alert]" = asyncio.Queue()
+    worker = asyncio.create_task(deliver(alerts, sinks))
+    try:
+        async for event in source.open_stream(args):
+            arrived = time.time()
+            games = parser.parse(event).games
+            if games is None:
+                continue
+            for alert in engine.check(games.schedule, arrived):
+                alerts.put_nowait(alert)
+        await alerts.join()
+    finally:
+        worker.cancel()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,142 @@
+"""Rules to alert on, checked against each game that changed
+
+A rule is a kind of happening, optionally narrowed to one team. Rules are
+indexed by team, so a changed game is only checked against the rules for
+the two teams playing it and those for every team, however many rules
+there are in total.
+"""
+import time
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+from uuid import UUID
+
+from models import JSON
+from models.game import Game
+
+# Each side of the game a happening is for, or None for the game as a whole
+Happening = tuple[Optional[str], str]
+
+
+def scores(previous: Game, game: Game) -> Iterator[Happening]:
+    score = f"{game.away_team_nickname} {game.away_score:g} - {game.home_team_nickname} {game.home_score:g}"
+    if game.away_score > previous.away_score:
+        yield "away", f"The {game.away_team_nickname} score! {score}"
+    if game.home_score > previous.home_score:
+        yield "home", f"The {game.home_team_nickname} score! {score}"
+
+
+def shame(previous: Game, game: Game) -> Iterator[Happening]:
+    if game.shame and not previous.shame:
+        yield None, f"{game.away_team_nickname} @ {game.home_team_nickname}: SHAME"
+
+
+def party(previous: Game, game: Game) -> Iterator[Happening]:
+    if game.last_update != previous.last_update and game.last_update.endswith("is Partying!"):
+        yield None, f"{game.away_team_nickname} @ {game.home_team_nickname}: {game.last_update}"
+
+
+def secret_base(previous: Game, game: Game) -> Iterator[Happening]:
+    if game.secret_baserunner and not previous.secret_baserunner:
+        yield None, f"{game.away_team_nickname} @ {game.home_team_nickname}: Someone is on the secret base"
+
+
+def final(previous: Game, game: Game) -> Iterator[Happening]:
+    if game.game_complete and not previous.game_complete:
+        yield None, (
+            f"FINAL {game.away_team_nickname} {game.away_score:g}"
+            f" - {game.home_team_nickname} {game.home_score:g}"
+        )
+
+
+KINDS: dict[str, Callable[[Game, Game], Iterable[Happening]]] = {
+    "scores": scores,
+    "shame": shame,
+    "party": party,
+    "secret_base": secret_base,
+    "final": final,
+}
+
+
+class Rule(NamedTuple):
+    kind: str
+    # A team id, name or nickname, or None for every team
+    team: Optional[str] = None
+
+    @classmethod
+    def parse(cls, text: str) -> "Rule":
+        """A rule written as kind or kind:team"""
+        kind, _, team = text.partition(":")
+        if kind not in KINDS:
+            raise ValueError(f"{kind!r} is not one of {', '.join(KINDS)}")
+        return cls(kind, team or None)
+
+
+class Alert(NamedTuple):
+    rule: Rule
+    game: UUID
+    message: str
+    # When the event that set this off was read
+    arrived: float
+
+    def payload(self) -> JSON:
+        return {
+            "kind": self.rule.kind,
+            "team": self.rule.team,
+            "game": str(self.game),
+            "message": self.message,
+            "arrived": self.arrived,
+            "latency": time.time() - self.arrived,
+        }
+
+
+def team_keys(game: Game, side: str) -> set[str]:
+    """Everything a rule might call the team playing on one side"""
+    return {
+        str(getattr(game, f"{side}_team")),
+        getattr(game, f"{side}_team_name").lower(),
+        getattr(game, f"{side}_team_nickname").lower(),
+    }
+
+
+class Engine:
+    def __init__(self, rules: Iterable[Rule]) -> None:
+        # Team key, then kind
+        self._index: dict[Optional[str], dict[str, list[Rule]]] = {}
+        for rule in rules:
+            team = rule.team.lower() if rule.team else None
+            self._index.setdefault(team, {}).setdefault(rule.kind, []).append(rule)
+        self._games: dict[UUID, Game] = {}
+
+    def _rules(self, keys: set[str]) -> dict[str, list[Rule]]:
+        rules: dict[str, list[Rule]] = {}
+        for key in keys:
+            for kind, kind_rules in self._index.get(key, {}).items():
+                rules.setdefault(kind, []).extend(kind_rules)
+        return rules
+
+    def check(self, schedule: list[Game], arrived: float) -> list[Alert]:
+        """Alerts for whatever happened since the last schedule
+
+        Games are only looked at when they are not the same objects as last
+        time, which the stream parser keeps them as when nothing changed.
+        """
+        alerts: list[Alert] = []
+        games: dict[UUID, Game] = {}
+        for game in schedule:
+            games[game.id] = game
+            previous = self._games.get(game.id)
+            if previous is None or previous is game:
+                # Nothing to compare a new game against yet
+                continue
+
+            sides = {side: self._rules(team_keys(game, side)) for side in ("away", "home")}
+            everyone = self._index.get(None, {})
+            for kind in everyone.keys() | sides["away"].keys() | sides["home"].keys():
+                for side, message in KINDS[kind](previous, game):
+                    if side is None:
+                        rules = [*sides["away"].get(kind, ()), *sides["home"].get(kind, ())]
+                    else:
+                        rules = list(sides[side].get(kind, ()))
+                    rules.extend(everyone.get(kind, ()))
+                    alerts.extend(Alert(rule, game.id, message, arrived) for rule in rules)
+        self._games = games
+        return alerts
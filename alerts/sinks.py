@@ -0,0 +1,49 @@
+"""Places to send alerts to"""
+import json
+import sys
+import urllib.request
+from pathlib import Path
+from typing import Union
+
+from alerts.rules import Alert
+
+WEBHOOK_TIMEOUT = 5
+
+
+class FileSink:
+    """Append each alert to a file as a line of JSON, or print it for -"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def send(self, alert: Alert) -> None:
+        line = json.dumps(alert.payload()) + "\n"
+        if self.path == "-":
+            sys.stdout.write(line)
+            sys.stdout.flush()
+        else:
+            with Path(self.path).open("a") as alert_file:
+                alert_file.write(line)
+
+
+class WebhookSink:
+    """POST each alert to a URL as JSON"""
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+
+    def send(self, alert: Alert) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(alert.payload()).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=WEBHOOK_TIMEOUT):
+                pass
+        except OSError as error:
+            # One missed alert shouldn't stop the rest
+            print(f"Couldn't send alert to {self.url}: {error}", file=sys.stderr)
+
+
+Sink = Union[FileSink, WebhookSink]
@@ -0,0 +1,157 @@
+"""Synthetic stream events shaped like the real thing, for benchmarks"""
+import random
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Any, Literal, Union, get_args, get_origin, get_type_hints
+from uuid import UUID
+
+from pydantic.color import Color
+
+from models import JSON, FixedModel, Nothing
+from models.game import Game
+from models.league import Division, League, Subleague, Tiebreakers
+from models.live import StreamData
+from models.team import Stadium, Team
+from stream.record import Recorder
+
+NOW = datetime(2021, 6, 1, tzinfo=timezone.utc).isoformat()
+WORDS = ["Sun 2", "Eclipse", "the Mechanics", "Wild", "Mild", "🔧", ""]
+
+
+def fake(type_: Any, rng: random.Random) -> Any:
+    """Make up a JSON value that validates as type_"""
+    origin = get_origin(type_)
+    if origin is Union:
+        options = [arg for arg in get_args(type_) if arg not in (type(None), Nothing)]
+        return fake(options[-1], rng)
+    if origin is Literal:
+        return get_args(type_)[0]
+    if origin in (list, tuple):
+        args = get_args(type_)
+        return [fake(args[0], rng) for _ in range(2)] if origin is list else [fake(arg, rng) for arg in args]
+    if origin is dict:
+        key, value = get_args(type_)
+        return {str(fake(key, rng)): fake(value, rng) for _ in range(2)}
+    if isinstance(type_, type) and issubclass(type_, FixedModel):
+        return fake_model(type_, rng)
+    if not isinstance(type_, type):
+        raise TypeError(f"Don't know how to fake {type_}")
+    if issubclass(type_, UUID):
+        return str(UUID(int=rng.getrandbits(128), version=4))
+    if issubclass(type_, Color):
+        return f"#{rng.randrange(0x1000000):06x}"
+    if issubclass(type_, datetime):
+        return NOW
+    if issubclass(type_, Enum):
+        return next(iter(type_)).value
+    if issubclass(type_, bool):
+        return rng.random() < 0.5
+    if issubclass(type_, int):
+        return rng.randrange(10)
+    if issubclass(type_, float):
+        return rng.random()
+    if issubclass(type_, str):
+        return rng.choice(WORDS)
+    raise TypeError(f"Don't know how to fake {type_}")
+
+
+def fake_model(model: type[FixedModel], rng: random.Random, **values: Any) -> JSON:
+    hints = get_type_hints(model)
+    raw = {
+        field.alias: fake(hints[field.name], rng)
+        for field in model.__fields__.values()
+    }
+    raw.update(values)
+    return raw
+
+
+def stream_event(teams: int = 24, seed: int = 0) -> JSON:
+    """A full stream event for a league of teams split into two subleagues of two divisions"""
+    rng = random.Random(seed)
+    team_data = [fake_model(Team, rng) for _ in range(teams)]
+    team_ids = [team["id"] for team in team_data]
+    stadiums = [fake_model(Stadium, rng, teamId=team_id) for team_id in team_ids]
+    for team, stadium in zip(team_data, stadiums):
+        team["stadium"] = stadium["id"]
+
+    quarter = teams // 4
+    divisions = [
+        fake_model(Division, rng, name=name, teams=team_ids[i * quarter:(i + 1) * quarter])
+        for i, name in enumerate(["Wild High", "Wild Low", "Mild High", "Mild Low"])
+    ]
+    subleagues = [
+        fake_model(Subleague, rng, name=name, divisions=[division["id"] for division in divisions[i * 2:(i + 1) * 2]])
+        for i, name in enumerate(["The Wild League", "The Mild League"])
+    ]
+    tiebreakers = fake_model(Tiebreakers, rng, order=rng.sample(team_ids, teams))
+    league = fake_model(
+        League, rng,
+        subleagues=[subleague["id"] for subleague in subleagues],
+        tiebreakers=tiebreakers["id"],
+    )
+
+    day = rng.randrange(1, 90)
+    played = {team_id: day for team_id in team_ids}
+    wins = {team_id: rng.randrange(day + 1) for team_id in team_ids}
+    losses = {team_id: day - wins[team_id] for team_id in team_ids}
+
+    def schedule() -> list[JSON]:
+        order = rng.sample(team_ids, teams)
+        return [
+            fake_model(
+                Game, rng,
+                awayTeam=away, homeTeam=home, stadiumId=stadiums[team_ids.index(home)]["id"],
+                awayOdds=odds, homeOdds=1 - odds, day=day, season=0,
+            )
+            for away, home, odds in zip(order[::2], order[1::2], (rng.random() for _ in order))
+        ]
+
+    event = fake_model(StreamData, rng)
+    event["games"].update(
+        schedule=schedule(),
+        tomorrowSchedule=schedule(),
+        standings=dict(event["games"]["standings"], wins=wins, losses=losses, gamesPlayed=played),
+    )
+    event["games"]["sim"]["day"] = day
+    for postseason in event["games"]["postseasons"]:
+        # Rounds not played yet have "none" for their winners and games
+        for playoff_round in [postseason["round"], postseason["tomorrowRound"], *postseason["allRounds"]]:
+            playoff_round["winners"][-1] = "none"
+            playoff_round["games"][-1] = ["none", "none"]
+    event["leagues"].update(
+        leagues=[league],
+        subleagues=subleagues,
+        divisions=divisions,
+        teams=team_data,
+        stadiums=stadiums,
+        tiebreakers=[tiebreakers],
+    )
+    return event
+
+
+def recording(path: Union[str, Path], events: int = 500, teams: int = 24, seed: int = 0) -> None:
+    """Write a recording of a day of games being played out, an event every few seconds"""
+    rng = random.Random(seed)
+    event = stream_event(teams, seed)
+    games = event["games"]
+    standings = games["standings"]
+    for game in games["schedule"]:
+        game.update(gameStart=True, gameComplete=False, playCount=0, basesOccupied=[], baseRunners=[], baseRunnerNames=[])
+
+    arrived = datetime.fromisoformat(NOW).timestamp()
+    with Recorder(path) as recorder:
+        for _ in range(events):
+            game = rng.choice(games["schedule"])
+            if not game["gameComplete"]:
+                game["playCount"] += 1
+                game["lastUpdate"] = f"Play {game['playCount']}"
+                if game["playCount"] > events // len(games["schedule"]):
+                    game["gameComplete"] = True
+                    winner, loser = rng.sample([game["homeTeam"], game["awayTeam"]], 2)
+                    standings["wins"][winner] += 1
+                    standings["losses"][loser] += 1
+                    for team_id in (winner, loser):
+                        standings["gamesPlayed"][team_id] += 1
+            arrived += rng.uniform(1, 5)
+            recorder.write(event, arrived)
@@ -0,0 +1,103 @@
+"""Replay a recording through the parse, compute and draw paths and time each
+
+Usage: python -m bench.replay [recording] [--pipeline]
+
+Without a recording, a synthetic one of a day of games is made up first.
+With --pipeline the events are also pushed through the threaded pipeline
+at full speed, to see how far behind drawing falls.
+"""
+import argparse
+import asyncio
+import io
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from rich.console import Console
+
+from bench.fixtures import recording
+from models.live import StreamParser
+from standings import display, season
+from standings.__main__ import SECTIONS
+from standings.elimination import Solver
+from stream import record
+from stream.pipeline import Pipeline, Stage
+
+
+def summary(name: str, seconds: list[float]) -> str:
+    seconds = sorted(seconds)
+    p95 = seconds[int(len(seconds) * 0.95)]
+    return (
+        f"{name:>8}: mean {statistics.fmean(seconds) * 1000:7.2f} ms"
+        f"  p50 {statistics.median(seconds) * 1000:7.2f} ms  p95 {p95 * 1000:7.2f} ms"
+    )
+
+
+def paths() -> tuple[Callable[[str], Any], Callable[[Any], Any], Callable[[Any], None]]:
+    """Fresh parse, compute and draw functions for the standings view"""
+    parser = StreamParser(SECTIONS, lazy={"leagues"}, views=True)
+    tracker = season.Tracker()
+    solver = Solver()
+    console = Console(file=io.StringIO(), width=160, height=50)
+
+    def parse(text: str) -> Any:
+        return parser.parse(json.loads(text), copy=False)
+
+    def compute(stream_data: Any) -> Any:
+        games, leagues = stream_data.games, stream_data.leagues
+        changed = tracker.update(games, leagues)
+        return games.sim, dict(tracker.predictions), solver.solve(games, leagues), changed
+
+    def draw(frame: Any) -> None:
+        sim, predictions, magic, changed = frame
+        if changed:
+            display.update_standings(predictions, sim, None, magic, changed)
+            console.print(display.layout)
+
+    return parse, compute, draw
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Benchmark the standings view on a recording")
+    arg_parser.add_argument("recording", nargs="?", type=Path)
+    arg_parser.add_argument("--pipeline", action="store_true")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.recording
+        if path is None:
+            path = Path(directory) / "synthetic.jsonl.gz"
+            recording(path)
+        texts = [json.dumps(event) for _, event in record.read(path)]
+
+        parse, compute, draw = paths()
+        timings: dict[str, list[float]] = {"parse": [], "compute": [], "draw": []}
+        started = time.perf_counter()
+        for text in texts:
+            value: Any = text
+            for name, stage in (("parse", parse), ("compute", compute), ("draw", draw)):
+                stage_started = time.perf_counter()
+                value = stage(value)
+                timings[name].append(time.perf_counter() - stage_started)
+        total = time.perf_counter() - started
+
+        print(f"{len(texts)} events, {len(texts) / total:.0f} events/s one at a time")
+        for name, seconds in timings.items():
+            print(summary(name, seconds))
+
+        if args.pipeline:
+            parse, compute, draw = paths()
+            pipeline = Pipeline(Stage("parse", parse), Stage("compute", compute), Stage("draw", draw))
+            started = time.perf_counter()
+            asyncio.run(pipeline.run(record.replay(path, speed=None), json.dumps))
+            total = time.perf_counter() - started
+            print(f"pipeline: {len(texts) / total:.0f} events/s")
+            for stats in pipeline.stats():
+                print(f"{'':>10}{stats} {stats.done} done")
+
+
+if __name__ == "__main__":
+    main()
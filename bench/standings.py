@@ -0,0 +1,31 @@
+"""Time season.get_standings on synthetic leagues of growing size
+
+Usage: python -m bench.standings [-n NUMBER] [TEAMS ...]
+"""
+import argparse
+import timeit
+
+from bench.fixtures import stream_event
+from models.live import StreamData
+from standings import season
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the standings ranking pass")
+    parser.add_argument("teams", nargs="*", type=int, default=[24, 48, 96])
+    parser.add_argument("-n", "--number", type=int, default=200)
+    args = parser.parse_args()
+
+    for teams in args.teams:
+        data = StreamData.parse_obj(stream_event(teams))
+        games, leagues = data.games, data.leagues
+        assert games and leagues
+        seconds = timeit.timeit(
+            lambda: season.get_standings(games, leagues),
+            number=args.number,
+        ) / args.number
+        print(f"{teams:>4} teams: {seconds * 1000:8.3f} ms {seconds * 1e6 / teams:8.2f} µs/team")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Compare validated and trusted parsing of a stream event
+
+Usage: python -m bench.trusted [event.json]
+"""
+import argparse
+import json
+import timeit
+
+from bench.fixtures import stream_event
+from models.live import StreamData
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark trusted model building")
+    parser.add_argument("event", nargs="?", help="JSON file of a recorded stream event")
+    parser.add_argument("-n", "--number", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.event:
+        with open(args.event) as event_file:
+            event = json.load(event_file)
+    else:
+        event = stream_event()
+
+    if StreamData.parse_trusted(event) != StreamData.parse_obj(event):
+        raise SystemExit("Trusted parsing built something different!")
+
+    validated = timeit.timeit(lambda: StreamData.parse_obj(event), number=args.number) / args.number
+    trusted = timeit.timeit(lambda: StreamData.parse_trusted(event), number=args.number) / args.number
+    print(f"parse_obj:     {validated * 1000:8.2f} ms")
+    print(f"parse_trusted: {trusted * 1000:8.2f} ms ({validated / trusted:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Compare Game models against GameView for what the live renderer reads
+
+Usage: python -m bench.views [event.json]
+"""
+import argparse
+import json
+import timeit
+import tracemalloc
+from typing import Any, Callable
+
+from bench.fixtures import stream_event
+from models.game import Game, GameView
+
+# Roughly what live.little_game and live.inning look at
+FIELDS = [
+    "id", "game_start", "game_complete", "shame", "state", "inning", "top_of_inning",
+    "weather", "away_team_nickname", "away_score", "home_team_nickname", "home_score",
+    "score_update", "last_update", "outcomes", "score_ledger", "home_odds", "away_odds",
+]
+
+
+def read(games: list[Any]) -> None:
+    for game in games:
+        for field in FIELDS:
+            getattr(game, field)
+
+
+def memory(build: Callable[[], list[Any]]) -> int:
+    # The raw JSON isn't counted, the stream parser keeps it around either way
+    tracemalloc.start()
+    games = build()
+    read(games)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark GameView against Game")
+    parser.add_argument("event", nargs="?", help="JSON file of a recorded stream event")
+    parser.add_argument("-n", "--number", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.event:
+        with open(args.event) as event_file:
+            event = json.load(event_file)
+    else:
+        event = stream_event()
+    raw_games = event["games"]["schedule"] + event["games"]["tomorrowSchedule"]
+
+    builders: dict[str, Callable[[], list[Any]]] = {
+        "Game": lambda: [Game.parse_obj(game) for game in raw_games],
+        "GameView": lambda: [GameView(game) for game in raw_games],
+    }
+    print(f"{len(raw_games)} games, reading {len(FIELDS)} fields each")
+    for name, build in builders.items():
+        seconds = timeit.timeit(lambda: read(build()), number=args.number) / args.number
+        print(f"{name:>8}: {seconds * 1000:8.2f} ms {memory(build) / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,17 @@
 import argparse
 import time
 from functools import partial
+from pathlib import Path
 from typing import Any, Optional, Union
 
 from blaseball_mike import database
-from blaseball_mike.models import Weather
 from blaseball_mike.tables import StatType, Tarot
 from rich.live import Live
 from rich.table import Table
 from rich.text import Text
 
 from feed.enums import Location, ModColor
+from models import reference
 
 JSON = dict[str, Any]
 TAROT = "#a16dc3"
@@ -82,8 +83,8 @@ def _do_feed(feed: list[JSON], excludes: list[str]) -> Table:
         elif entry["type"] == 26:
             # Weather changed
             changes = Text.assemble(
-                f"{Weather.load_one(metadata['before']).name} -> ",
-                Weather.load_one(metadata["after"]).name,
+                f"{reference.weather_name(metadata['before'])} -> ",
+                reference.weather_name(metadata["after"]),
             )
         elif entry["type"] == 81:
             # Tarot reading
@@ -385,10 +386,12 @@ def main() -> None:
     parser.add_argument("-c", "--category", type=int, default=None)
     parser.add_argument("-n", "--interval", type=int, default=60)
     parser.add_argument("--no-ghosts", action="store_true")
+    parser.add_argument("--reference-cache", type=Path, help="Directory to keep lookup tables in between runs")
     group = parser.add_mutually_exclusive_group()
     group.add_argument("-t", "--team", type=str)
     group.add_argument("-p", "--player", type=str)
     args = parser.parse_args()
+    reference.preload(args.reference_cache)
 
     excludes = []
     if args.no_ghosts:
@@ -5,6 +5,7 @@ from pathlib import Path
 
 from blaseball_mike import models
 
+from party.publish import publish, publish_shards
 from party.teams import collect_records
 
 
@@ -21,17 +22,18 @@ def main(season_no=None):
         "season": season_no,
         "team_data": records,
     }
-    json_file_path = json_path / f"teams.{season_no}.json"
-    with open(json_file_path, "w") as json_file:
-        json.dump(bundle, json_file, default=lambda o: o.to_json())
-
-    if season_no is not None:
-        # Atomically replace existing symlink
-        temp_link = json_path / "teams.tmp"
-        temp_link.unlink(missing_ok=True)
-        temp_link.symlink_to(json_file_path)
-        final_link = json_path / "teams.json"
-        temp_link.replace(final_link)
+    # One file for each team, and an index of them, for pages that only need one
+    shards = {
+        team_id: json.dumps({"updated": bundle["updated"], "season": season_no, "team": record})
+        for team_id, record in records.items()
+    }
+    index = json.dumps({
+        "updated": bundle["updated"],
+        "season": season_no,
+        "teams": {team_id: record["name"] for team_id, record in records.items()},
+    })
+    publish_shards(json_path, "teams", season_no, shards, index)
+    publish(json_path, "teams", season_no, json.dumps(bundle, default=lambda o: o.to_json()))
 
 
 if __name__ == "__main__":
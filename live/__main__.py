@@ -1,12 +1,15 @@
 #!/usr/bin/env python
+import argparse
 import asyncio
+import json
+import sys
 from datetime import datetime, timedelta, timezone
-from typing import Generator
+from pathlib import Path
+from typing import Callable, Generator, Hashable, NamedTuple, Optional
+from uuid import UUID
 
-from blaseball_mike.events import stream_events
-from blaseball_mike.models import Weather
 from rich.columns import Columns
-from rich.console import RenderGroup
+from rich.console import RenderableType, RenderGroup
 from rich.layout import Layout
 from rich.live import Live
 from rich.panel import Panel
@@ -14,14 +17,30 @@ from rich.progress import BarColumn, Progress
 from rich.table import Table
 from rich.text import Text
 
-from models.game import Game, SimData
-from models.live import StreamData
+from models import JSON, reference
+from models.game import Game, GamesData, SimData
+from models.league import LeagueData
+from models.live import Selection, StreamParser
+from models.players import PLAYERS
 from models.team import Stadium
+from stream import source
+from stream.pipeline import Pipeline, Stage
+from stream.snapshot import Snapshot
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 TEAM_URL = "https://www.blaseball.com/team"
 PLAYER_URL = "https://www.blaseball.com/player"
 LINK = "[link={url}/{id!s}]{name}"
 TEAM = "Mechanics"
+SECTIONS: Selection = {
+    "games": frozenset({"sim", "schedule", "tomorrow_schedule"}),
+    "leagues": frozenset({"stadiums", "stats"}),
+}
+OUTPUTS = ("ndjson", "msgpack")
 
 
 def inning(game: Game) -> Text:
@@ -157,7 +176,7 @@ def get_team_game(nickname: str, schedule: list[Game]) -> Game:
 
 
 def big_game(game: Game, stadium: Stadium) -> Panel:
-    weather = Weather.load_one(game.weather).name
+    weather = reference.weather_name(game.weather)
     if game.is_postseason:
         series = f"First to ±{game.series_length}"
     else:
@@ -231,7 +250,7 @@ def big_game(game: Game, stadium: Stadium) -> Panel:
 
 
 def little_game(game: Game) -> Panel:
-    weather = Weather.load_one(game.weather).name
+    weather = reference.weather_name(game.weather)
 
     grid = Table.grid(expand=True)
     grid.add_column()
@@ -244,25 +263,199 @@ def little_game(game: Game) -> Panel:
     return Panel(RenderGroup(grid, update(game)), width=30, border_style=style)
 
 
-def render_games(games: list[Game], stadia: list[Stadium]) -> Generator[Panel, None, None]:
-    highlight = None
-    stadium = None
+class PanelCache:
+    """Rendered panels for each game, kept until something shown in them changes"""
+
+    def __init__(self) -> None:
+        self._panels: dict[tuple[str, UUID], tuple[Hashable, Panel]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind: str, game: Game, key: Hashable, render: Callable[[], Panel]) -> Panel:
+        cached = self._panels.get((kind, game.id))
+        if cached is not None and cached[0] == key:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        panel = render()
+        self._panels[kind, game.id] = (key, panel)
+        return panel
+
+    def keep(self, games: list[Game]) -> None:
+        """Forget panels of games no longer on the schedule"""
+        game_ids = {game.id for game in games}
+        for kind, game_id in list(self._panels):
+            if game_id not in game_ids:
+                del self._panels[kind, game_id]
+
+
+def game_key(game: Game) -> Hashable:
+    return (game.play_count, game.game_start, game.game_complete)
+
+
+def cached_little_game(game: Game, cache: PanelCache) -> Panel:
+    return cache.get("little", game, game_key(game), lambda: little_game(game))
+
+
+class Frame(NamedTuple):
+    chest: float
+    sunsun: tuple[float, int]
+    phase: Optional[tuple[str, int, int]] = None
+    day: int = 0
+    highlight: Optional[RenderableType] = None
+    games: Optional[RenderableType] = None
+    cached: tuple[int, int] = (0, 0)
+
+
+def order_games(schedule: list[Game]) -> list[Game]:
+    games = sorted(
+        schedule,
+        key=lambda x: x.home_odds * x.away_odds + x.game_complete,
+    )
+    try:
+        favored = get_team_game(TEAM, games)
+        # Reposition followed team to the front
+        games.remove(favored)
+        games.insert(0, favored)
+    except ValueError:
+        pass
+    return games
+
+
+def featured_game(games: list[Game]) -> Game:
     for game in games:
         if game.game_start and not game.game_complete:
-            highlight = game
-            break
-    else:
-        highlight = games[0]
-    stadium = [stadium for stadium in stadia if stadium.id == highlight.stadium_id][0]
+            return game
+    return games[0]
+
+
+def render_games(games: list[Game], leagues: LeagueData, cache: PanelCache) -> Generator[Panel, None, None]:
+    highlight = featured_game(games)
+    stadium = leagues.get_stadium(highlight.stadium_id)
     if not highlight.game_complete:
-        yield big_game(highlight, stadium)
+        key = (
+            game_key(highlight),
+            stadium.state.json(),
+            tuple(stadium.mods),
+            # Filled in by the player cache after the fact
+            highlight.secret_baserunner_name,
+        )
+        yield cache.get("big", highlight, key, lambda: big_game(highlight, stadium))
 
     for game in games:
         if game.game_complete or game is not highlight:
-            yield little_game(game)
+            yield cached_little_game(game, cache)
+
+
+def game_state(game: Game) -> JSON:
+    return {
+        "id": str(game.id),
+        "away": game.away_team_nickname,
+        "home": game.home_team_nickname,
+        "away_score": game.away_score,
+        "home_score": game.home_score,
+        "away_odds": game.away_odds,
+        "home_odds": game.home_odds,
+        "inning": game.inning + 1,
+        "top": game.top_of_inning,
+        "started": game.game_start,
+        "complete": game.game_complete,
+        "weather": reference.weather_name(game.weather),
+        "update": game.last_update,
+    }
+
+
+def frame_state(state: tuple[LeagueData, Optional[GamesData]]) -> JSON:
+    """What the live view shows, as plain data"""
+    leagues, games = state
+    frame: JSON = {
+        "chest": leagues.stats.community_chest.runs,
+        "sunsun": [leagues.stats.sunsun.current, leagues.stats.sunsun.maximum],
+    }
+    if not games:
+        return frame
+
+    today = order_games(games.schedule)
+    tomorrow = order_games(games.tomorrow_schedule)
+    phase_name, completed, total = phase_time(games.sim)
+    frame.update(
+        phase=phase_name,
+        progress=[completed, total],
+        day=games.sim.day,
+        highlight=str(featured_game(today).id) if today else None,
+        today=[game_state(game) for game in today],
+        tomorrow=[game_state(game) for game in tomorrow],
+    )
+    return frame
+
+
+def frame_writer(output: str) -> Callable[[JSON], None]:
+    """Write frames to stdout, one JSON line or msgpack object each"""
+    if output == "msgpack":
+        def write(frame: JSON) -> None:
+            sys.stdout.buffer.write(msgpack.packb(frame))
+            sys.stdout.buffer.flush()
+    else:
+        def write(frame: JSON) -> None:
+            sys.stdout.write(json.dumps(frame, separators=(",", ":")) + "\n")
+            sys.stdout.flush()
+    return write
 
 
 async def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Show live Blaseball games")
+    arg_parser.add_argument("--reference-cache", type=Path, help="Directory to keep lookup tables in between runs")
+    arg_parser.add_argument("--snapshot", type=Path, help="File to keep the latest data in, to show straight away next run")
+    arg_parser.add_argument("--debug", action="store_true", help="Show how the panel cache and each stage are doing")
+    source.add_arguments(arg_parser)
+    arg_parser.add_argument("--fps", type=float, default=4, help="Most frames to draw a second")
+    arg_parser.add_argument(
+        "--output", choices=OUTPUTS, help="Write frames to stdout in this format instead of drawing them",
+    )
+    args = arg_parser.parse_args()
+    if args.output == "msgpack" and msgpack is None:
+        arg_parser.error("msgpack output needs the msgpack package installed")
+    reference.preload(args.reference_cache)
+
+    snapshot = Snapshot(args.snapshot) if args.snapshot else None
+    parser = StreamParser(SECTIONS, views=True, trusted=bool(args.hub))
+    leagues: Optional[LeagueData] = None
+    games: Optional[GamesData] = None
+
+    def parse(text: str) -> Optional[tuple[LeagueData, Optional[GamesData]]]:
+        nonlocal leagues, games
+        stream_data = parser.parse(json.loads(text), copy=False)
+        if snapshot:
+            snapshot.update(parser.raw)
+        if stream_data.leagues:
+            leagues = stream_data.leagues
+        if stream_data.games:
+            games = stream_data.games
+        if leagues is None:
+            return None
+        return leagues, games
+
+    async def run(pipeline: Pipeline) -> None:
+        events = source.open_stream(args)
+        if snapshot:
+            events = snapshot.events(events)
+        try:
+            # The stream client patches the same payload in place, so take a copy
+            # before reading on, and leave the parsing to the first stage.
+            await pipeline.run(events, json.dumps)
+        finally:
+            if snapshot:
+                snapshot.save(dict(parser.raw))
+
+    if args.output:
+        await run(Pipeline(
+            Stage("parse", parse),
+            Stage("compute", frame_state),
+            Stage("write", frame_writer(args.output), fps=args.fps),
+        ))
+        return
+
+    PLAYERS.start()
     phase_progress = Progress(
         "[progress.description]{task.description}",
         BarColumn(),
@@ -285,67 +478,73 @@ async def main() -> None:
         Layout(name="games"),
         Layout(name="progress", size=2),
     )
+    if args.debug:
+        layout.split(*layout.children, Layout(name="debug", size=1))
     layout["phase"].update(phase_progress)
     layout["games"].update(Text())
     layout["progress"].update(league_progress)
 
-    leagues = None
+    cache = PanelCache()
+
+    def compute(state: tuple[LeagueData, Optional[GamesData]]) -> Frame:
+        leagues, games = state
+        frame = Frame(
+            chest=leagues.stats.community_chest.runs,
+            sunsun=(leagues.stats.sunsun.current, leagues.stats.sunsun.maximum),
+        )
+        if not games:
+            return frame
+
+        today = order_games(games.schedule)
+        tomorrow = order_games(games.tomorrow_schedule)
+
+        cache.hits = cache.misses = 0
+        cache.keep(today + tomorrow)
+        game_widgets = render_games(today, leagues, cache)
+        try:
+            forecast = cached_little_game(tomorrow[0], cache)
+            highlight: RenderableType = Columns((next(game_widgets), forecast), expand=True)
+        except IndexError:
+            highlight = next(game_widgets)
+
+        return frame._replace(
+            phase=phase_time(games.sim),
+            day=games.sim.day,
+            highlight=highlight,
+            games=Columns(game_widgets, equal=True, expand=True),
+            cached=(cache.hits, cache.misses),
+        )
+
+    def draw(frame: Frame) -> None:
+        league_progress.update(chest, completed=frame.chest)
+        league_progress.update(sunsun, completed=frame.sunsun[0], total=frame.sunsun[1])
+        if frame.phase:
+            phase_name, completed, total = frame.phase
+            phase_progress.update(
+                phase,
+                description=f"{phase_name} Day {frame.day + 1}",
+                completed=completed,
+                total=total,
+            )
+        if frame.highlight is not None:
+            layout["highlight"].update(frame.highlight)
+        if frame.games is not None:
+            layout["games"].update(frame.games)
+        if args.debug:
+            hits, misses = frame.cached
+            layout["debug"].update(Text(
+                f"{hits} panels cached, {misses} built | {pipeline.report()}",
+                style="dim",
+            ))
+        live.refresh()
+
+    pipeline = Pipeline(
+        Stage("parse", parse),
+        Stage("compute", compute),
+        Stage("draw", draw, fps=args.fps),
+    )
     with Live(layout, auto_refresh=False) as live:
-        async for event in stream_events():
-            stream_data = StreamData.parse_obj(event)
-
-            if stream_data.leagues:
-                leagues = stream_data.leagues
-                chest_stats = leagues.stats.community_chest
-                league_progress.update(chest, completed=chest_stats.runs)
-                sun_stats = leagues.stats.sunsun
-                league_progress.update(sunsun, completed=sun_stats.current, total=sun_stats.maximum)
-            if leagues is None:
-                continue
-
-            if games := stream_data.games:
-                phase_name, completed, total = phase_time(games.sim)
-                phase_progress.update(
-                    phase,
-                    description=f"{phase_name} Day {games.sim.day + 1}",
-                    completed=completed,
-                    total=total,
-                )
-
-                today = sorted(
-                    games.schedule,
-                    key=lambda x: x.home_odds * x.away_odds + x.game_complete,
-                )
-                try:
-                    favored = get_team_game(TEAM, today)
-                    # Reposition followed team to the front
-                    today.remove(favored)
-                    today.insert(0, favored)
-                except ValueError:
-                    pass
-                tomorrow = sorted(
-                    games.tomorrow_schedule,
-                    key=lambda x: x.home_odds * x.away_odds + x.game_complete,
-                )
-                try:
-                    favored = get_team_game(TEAM, tomorrow)
-                    # Reposition followed team to the front
-                    tomorrow.remove(favored)
-                    tomorrow.insert(0, favored)
-                except ValueError:
-                    pass
-
-                game_widgets = render_games(today, leagues.stadiums)
-                try:
-                    forecast = little_game(tomorrow[0])
-                    layout["highlight"].update(Columns((next(game_widgets), forecast), expand=True))
-                except IndexError:
-                    layout["highlight"].update(next(game_widgets))
-                layout["games"].update(
-                    Columns(game_widgets, equal=True, expand=True)
-                )
-
-            live.refresh()
+        await run(pipeline)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,18 @@
-from pydantic import BaseModel
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Collection, Optional, TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel, ValidationError
+from pydantic.class_validators import make_generic_validator
+from pydantic.color import Color
+from pydantic.datetime_parse import parse_datetime
+from pydantic.fields import (SHAPE_DICT, SHAPE_LIST, SHAPE_SINGLETON,
+                             SHAPE_TUPLE, ModelField)
+
+JSON = dict[str, Any]
+Model = TypeVar("Model", bound="FixedModel")
+Converter = Callable[[Any], Any]
 
 
 def to_camel(name: str) -> str:
@@ -15,6 +29,250 @@ class FixedModel(BaseModel):
         allow_population_by_field_name = True
         arbitrary_types_allowed = True
 
+    @classmethod
+    def parse_trusted(cls: type[Model], obj: JSON) -> Model:
+        """Build the model from data known to be valid without validating it
+
+        Meant for data that has already been through parse_obj once, like
+        recorded events or our own snapshots.
+        """
+        converters = _converters(cls)
+        values = {}
+        for key, value in obj.items():
+            name, convert = converters[key]
+            values[name] = value if convert is None else convert(value)
+        fields_set = set(values)
+        if len(values) < len(cls.__fields__):
+            for field in cls.__fields__.values():
+                if field.name not in values:
+                    values[field.name] = field.get_default()
+
+        # Same as construct(), minus the bookkeeping we already did above
+        model = cls.__new__(cls)
+        object.__setattr__(model, "__dict__", values)
+        object.__setattr__(model, "__fields_set__", fields_set)
+        model._init_private_attributes()
+        return model
+
 
 class Nothing(FixedModel):
     """Empty dictionary instead of values"""
+
+
+_CONVERTERS: dict[type[FixedModel], dict[str, tuple[str, Optional[Converter]]]] = {}
+
+
+def _converters(model: type[FixedModel]) -> dict[str, tuple[str, Optional[Converter]]]:
+    if model not in _CONVERTERS:
+        converters = {}
+        for field in model.__fields__.values():
+            converters[field.alias] = converters[field.name] = (field.name, _field_converter(model, field))
+        _CONVERTERS[model] = converters
+    return _CONVERTERS[model]
+
+
+def _field_converter(model: type[FixedModel], field: ModelField) -> Optional[Converter]:
+    """Return a function building the value of field, or None if the JSON value will do"""
+    convert: Optional[Converter]
+    if field.shape == SHAPE_LIST:
+        assert field.sub_fields
+        item = _field_converter(model, field.sub_fields[0])
+        if item is None:
+            convert = list
+        else:
+            convert = lambda value: [item(v) for v in value]  # noqa: E731
+    elif field.shape == SHAPE_DICT:
+        assert field.key_field and field.sub_fields
+        key = _field_converter(model, field.key_field) or _same
+        item = _field_converter(model, field.sub_fields[0]) or _same
+        convert = lambda value: {key(k): item(v) for k, v in value.items()}  # noqa: E731
+    elif field.shape == SHAPE_TUPLE:
+        assert field.sub_fields
+        items = [_field_converter(model, sub_field) or _same for sub_field in field.sub_fields]
+        convert = lambda value: tuple(item(v) for item, v in zip(items, value))  # noqa: E731
+    elif field.shape == SHAPE_SINGLETON and field.sub_fields:
+        convert = _union_converter(model, field)
+    elif field.shape == SHAPE_SINGLETON:
+        convert = _type_converter(field.type_)
+    else:
+        raise TypeError(f"Can't build {field.name} without validation")
+
+    if convert is not None and field.allow_none:
+        convert = _none_converter(convert)
+    return _pre_converter(model, field, convert)
+
+
+def _none_converter(convert: Converter) -> Converter:
+    return lambda value: None if value is None else convert(value)
+
+
+def _pre_converter(model: type[FixedModel], field: ModelField, convert: Optional[Converter]) -> Optional[Converter]:
+    """Run the field's pre validators before convert, as validation would
+
+    Those can turn values the type wouldn't take into ones it will, like the
+    "none" strings in postseason rounds. Validators after the type's own are
+    still skipped, and pre validators are given no other values to look at.
+    """
+    validators = list(field.pre_validators or ())
+    if not field.sub_fields:
+        # Validators for each item end up on the innermost fields
+        validators.extend(
+            make_generic_validator(validator.func)
+            for validator in (field.class_validators or {}).values()
+            if validator.each_item and validator.pre
+        )
+    if not validators:
+        return convert
+    build = convert or _same
+
+    def pre_convert(value: Any) -> Any:
+        for validator in validators:
+            value = validator(model, value, {}, field, model.__config__)
+        return build(value)
+
+    return pre_convert
+
+
+def _union_converter(model: type[FixedModel], field: ModelField) -> Converter:
+    assert field.sub_fields
+    options = [sub_field.type_ for sub_field in field.sub_fields if _is_model(sub_field)]
+
+    def convert(value: Any) -> Any:
+        if isinstance(value, dict):
+            # Pick the first model the keys fit, like validation would
+            for option in options:
+                fields = option.__fields__.values()
+                if (
+                    value.keys() <= {f.alias for f in fields} | {f.name for f in fields}
+                    and all(f.alias in value or f.name in value for f in fields if f.required)
+                ):
+                    return option.parse_trusted(value)
+        return _validate(model, field, value, {})
+
+    return convert
+
+
+def _same(value: Any) -> Any:
+    return value
+
+
+def _type_converter(type_: Any) -> Optional[Converter]:
+    if isinstance(type_, type):
+        if hasattr(type_, "intern"):
+            return type_.intern
+        if issubclass(type_, FixedModel):
+            return type_.parse_trusted
+        if issubclass(type_, (UUID, Color, Enum)):
+            return lambda value: value if isinstance(value, type_) else type_(value)
+        if issubclass(type_, datetime):
+            return parse_datetime
+        if type_ is float:
+            return float
+    return None
+
+
+def _is_model(field: ModelField) -> bool:
+    return isinstance(field.type_, type) and issubclass(field.type_, FixedModel)
+
+
+def _has_ids(field: ModelField, *values: Any) -> bool:
+    return (
+        field.shape == SHAPE_LIST
+        and _is_model(field)
+        and "id" in field.type_.__fields__
+        and all(
+            isinstance(items, list)
+            and all(isinstance(item, dict) and "id" in item for item in items)
+            for items in values
+        )
+    )
+
+
+def _validate(model: type[FixedModel], field: ModelField, value: Any, values: JSON) -> Any:
+    result, errors = field.validate(value, values, loc=field.alias, cls=model)
+    if errors:
+        raise ValidationError([errors], model)
+    return result
+
+
+def _parse_items(
+    model: type[Model],
+    items: list[JSON],
+    previous_items: list[JSON],
+    previous: list[Model],
+    trusted: bool,
+) -> list[Model]:
+    known = {
+        item["id"]: (item, parsed)
+        for item, parsed in zip(previous_items, previous)
+    }
+    parse = model.parse_trusted if trusted else model.parse_obj
+    return [
+        parse_changed(model, item, *known[item["id"]], trusted=trusted)
+        if item["id"] in known else parse(item)
+        for item in items
+    ]
+
+
+def parse_changed(
+    model: type[Model],
+    raw: JSON,
+    previous_raw: Optional[JSON],
+    previous: Optional[Model],
+    only: Optional[Collection[str]] = None,
+    trusted: bool = False,
+) -> Model:
+    """Parse raw into model, reusing whatever previous already holds for unchanged values
+
+    previous_raw must be the data previous was parsed from. Nested models and
+    lists of models with ids are compared piece by piece, so only the parts
+    that actually differ get validated again. If only is given, any other
+    field is skipped and left unset on the result. With trusted, whatever
+    changed is built like parse_trusted does rather than validated.
+    """
+    if previous is None or not isinstance(previous_raw, dict):
+        if only is None:
+            return model.parse_trusted(raw) if trusted else model.parse_obj(raw)
+        previous_raw, previous = {}, None
+    elif raw == previous_raw:
+        return previous
+
+    fields = [
+        field for field in model.__fields__.values()
+        if only is None or field.name in only
+    ]
+    all_fields = model.__fields__.values()
+    known_keys = {field.alias for field in all_fields} | {field.name for field in all_fields}
+    if not isinstance(raw, dict) or raw.keys() - known_keys:
+        # Let pydantic explain what is wrong with it
+        return model.parse_obj(raw)
+
+    values: JSON = {}
+    for field in fields:
+        key = field.alias if field.alias in raw else field.name
+        if key not in raw:
+            if field.required:
+                return model.parse_obj(raw)
+            values[field.name] = field.get_default()
+            continue
+
+        value = raw[key]
+        old_value = previous_raw.get(key)
+        old_parsed = getattr(previous, field.name, None)
+        if key in previous_raw and value == old_value:
+            values[field.name] = old_parsed
+        elif _has_ids(field, value, old_value) and isinstance(old_value, list) and isinstance(old_parsed, list):
+            values[field.name] = _parse_items(field.type_, value, old_value, old_parsed, trusted)
+        elif (
+            field.shape == SHAPE_SINGLETON and _is_model(field)
+            and isinstance(value, dict) and isinstance(old_parsed, field.type_)
+        ):
+            values[field.name] = parse_changed(field.type_, value, old_value, old_parsed, trusted=trusted)
+        elif trusted:
+            _, convert = _converters(model)[key]
+            values[field.name] = value if convert is None else convert(value)
+        else:
+            values[field.name] = _validate(model, field, value, values)
+
+    fields_set = {field.name for field in fields if field.alias in raw or field.name in raw}
+    return model.construct(fields_set, **values)
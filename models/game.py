@@ -1,12 +1,11 @@
 from datetime import datetime
 from typing import Literal, Optional, Union
-from uuid import UUID
-
-from blaseball_mike.models import Player
-from pydantic.color import Color
 
 from models import FixedModel, Nothing
+from models.intern import UUID, Color, Name
+from models.players import PLAYERS
 from models.postseason import Postseason
+from models.view import view_of
 
 
 class SimState(FixedModel):
@@ -106,27 +105,27 @@ class Game(FixedModel):
     rules: UUID
     statsheet: UUID
     away_pitcher: Optional[UUID]
-    away_pitcher_name: str
+    away_pitcher_name: Name
     away_batter: Optional[UUID]
     away_batter_name: str
     away_team: UUID
-    away_team_name: str
-    away_team_nickname: str
+    away_team_name: Name
+    away_team_nickname: Name
     away_team_color: Color
-    away_team_emoji: str
+    away_team_emoji: Name
     away_odds: float
     away_strikes: int
     away_score: float
     away_team_batter_count: int
     home_pitcher: Optional[UUID]
-    home_pitcher_name: str
+    home_pitcher_name: Name
     home_batter: Optional[UUID]
     home_batter_name: str
     home_team: UUID
-    home_team_name: str
-    home_team_nickname: str
+    home_team_name: Name
+    home_team_nickname: Name
     home_team_color: Color
-    home_team_emoji: str
+    home_team_emoji: Name
     home_odds: float
     home_strikes: int
     home_score: float
@@ -184,7 +183,7 @@ class Game(FixedModel):
     @property
     def secret_baserunner_name(self) -> Optional[str]:
         if self.secret_baserunner:
-            return Player.load_one(str(self.secret_baserunner)).name
+            return PLAYERS.name(str(self.secret_baserunner))
         return None
 
 
@@ -195,3 +194,6 @@ class GamesData(FixedModel):
     schedule: list[Game]
     tomorrow_schedule: list[Game]
     postseasons: list[Union[Nothing, Postseason]]
+
+
+GameView = view_of(Game)
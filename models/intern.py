@@ -0,0 +1,113 @@
+"""Field types whose values are shared between every model that holds them
+
+The stream repeats the same ids, colors and names on every event, so rather
+than keeping a fresh copy of each per event, equal values come out of a
+bounded cache and are the same instance.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from typing import (TYPE_CHECKING, Any, Callable, Generator, Generic, Hashable,
+                    TypeVar)
+
+import pydantic.color
+from pydantic import errors
+from pydantic.validators import str_validator
+
+Value = TypeVar("Value")
+Validators = Generator[Callable[..., Any], None, None]
+
+
+class Interner(Generic[Value]):
+    """Least recently used cache of values built from their raw form
+
+    Models are built on more than one thread at once, so the cache is only
+    touched under a lock.
+    """
+
+    def __init__(self, build: Callable[[Any], Value], size: int) -> None:
+        self.build = build
+        self.size = size
+        self._values: OrderedDict[Hashable, Value] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, raw: Hashable) -> Value:
+        with self._lock:
+            value = self._values.get(raw)
+            if value is not None:
+                self._values.move_to_end(raw)
+                return value
+        # Built outside the lock, as it raises for anything invalid
+        built = self.build(raw)
+        with self._lock:
+            value = self._values.setdefault(raw, built)
+            self._values.move_to_end(raw)
+            if len(self._values) > self.size:
+                self._values.popitem(last=False)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+UUIDS: Interner[uuid.UUID] = Interner(uuid.UUID, size=8192)
+COLORS: Interner[pydantic.color.Color] = Interner(pydantic.color.Color, size=1024)
+NAMES: Interner[str] = Interner(str, size=4096)
+
+
+class InternedUUID(uuid.UUID):
+    """A UUID field, interned"""
+
+    @classmethod
+    def __get_validators__(cls) -> Validators:
+        yield cls.intern
+
+    @staticmethod
+    def intern(value: Any) -> uuid.UUID:
+        if isinstance(value, uuid.UUID):
+            return value
+        if not isinstance(value, str):
+            raise errors.UUIDError()
+        try:
+            return UUIDS(value)
+        except ValueError:
+            raise errors.UUIDError()
+
+
+class InternedColor(pydantic.color.Color):
+    """A color field, interned"""
+
+    @classmethod
+    def __get_validators__(cls) -> Validators:
+        yield cls.intern
+
+    @staticmethod
+    def intern(value: Any) -> pydantic.color.Color:
+        if isinstance(value, pydantic.color.Color):
+            return value
+        if isinstance(value, Hashable):
+            return COLORS(value)
+        return pydantic.color.Color(value)
+
+
+class InternedName(str):
+    """A string that repeats a lot between events, like team names and emoji, interned"""
+
+    @classmethod
+    def __get_validators__(cls) -> Validators:
+        yield cls.intern
+
+    @staticmethod
+    def intern(value: Any) -> str:
+        return NAMES(str_validator(value))
+
+
+if TYPE_CHECKING:
+    # The fields hold plain values, which is what to check them as
+    UUID = uuid.UUID
+    Color = pydantic.color.Color
+    Name = str
+else:
+    UUID = InternedUUID
+    Color = InternedColor
+    Name = InternedName
@@ -1,6 +1,9 @@
-from uuid import UUID
+from typing import NamedTuple, Optional
+
+from pydantic import PrivateAttr
 
 from models import FixedModel
+from models.intern import UUID
 from models.team import Stadium, Team
 
 
@@ -44,6 +47,18 @@ class LeagueStats(FixedModel):
     sunsun: SunSun
 
 
+class LeagueIndex(NamedTuple):
+    leagues: dict[UUID, League]
+    subleagues: dict[UUID, Subleague]
+    divisions: dict[UUID, Division]
+    teams: dict[UUID, Team]
+    stadiums: dict[UUID, Stadium]
+    tiebreakers: dict[UUID, Tiebreakers]
+    team_division: dict[UUID, Division]
+    team_subleague: dict[UUID, Subleague]
+    team_league: dict[UUID, League]
+
+
 class LeagueData(FixedModel):
     leagues: list[League]
     stadiums: list[Stadium]
@@ -53,8 +68,59 @@ class LeagueData(FixedModel):
     tiebreakers: list[Tiebreakers]
     stats: LeagueStats
 
+    _index: Optional[LeagueIndex] = PrivateAttr(default=None)
+
+    @property
+    def index(self) -> LeagueIndex:
+        """Lookups by id and team membership, built the first time they're needed"""
+        if self._index is None:
+            # Fields skipped by the stream parser are simply left out
+            fields = self.__dict__
+            leagues = {league.id: league for league in fields.get("leagues", ())}
+            subleagues = {subleague.id: subleague for subleague in fields.get("subleagues", ())}
+            divisions = {division.id: division for division in fields.get("divisions", ())}
+
+            subleague_league = {
+                subleague_id: league
+                for league in leagues.values()
+                for subleague_id in league.subleagues
+            }
+            division_subleague = {
+                division_id: subleague
+                for subleague in subleagues.values()
+                for division_id in subleague.divisions
+            }
+            team_division = {
+                team_id: division
+                for division in divisions.values()
+                for team_id in division.teams
+            }
+            team_subleague = {
+                team_id: division_subleague[division.id]
+                for team_id, division in team_division.items()
+                if division.id in division_subleague
+            }
+            team_league = {
+                team_id: subleague_league[subleague.id]
+                for team_id, subleague in team_subleague.items()
+                if subleague.id in subleague_league
+            }
+
+            self._index = LeagueIndex(
+                leagues=leagues,
+                subleagues=subleagues,
+                divisions=divisions,
+                teams={team.id: team for team in fields.get("teams", ())},
+                stadiums={stadium.id: stadium for stadium in fields.get("stadiums", ())},
+                tiebreakers={tiebreakers.id: tiebreakers for tiebreakers in fields.get("tiebreakers", ())},
+                team_division=team_division,
+                team_subleague=team_subleague,
+                team_league=team_league,
+            )
+        return self._index
+
     def get_stadium(self, stadium_id: UUID) -> Stadium:
-        for stadium in self.stadiums:
-            if stadium.id == stadium_id:
-                return stadium
-        raise ValueError(f"Stadium {stadium_id!s} not found")
+        try:
+            return self.index.stadiums[stadium_id]
+        except KeyError:
+            raise ValueError(f"Stadium {stadium_id!s} not found")
@@ -1,8 +1,11 @@
-from typing import Optional, Union
+import json
+from typing import Any, Collection, Generic, Optional, Union
 
-from models import FixedModel, Nothing
-from models.game import Game, GamesData
+from models import (JSON, FixedModel, Model, Nothing, _is_model, _validate,
+                    parse_changed)
+from models.game import Game, GamesData, GameView
 from models.league import LeagueData
+from models.view import ModelView
 
 
 class FightData(FixedModel):
@@ -31,3 +34,135 @@ class StreamData(FixedModel):
     leagues: Optional[LeagueData]
     fights: Union[FightData, Nothing]
     temporal: Union[TemporalData, Nothing, None]
+
+
+class Lazy(Generic[Model]):
+    """A section kept as raw JSON until something first looks inside it"""
+
+    def __init__(
+        self,
+        model: type[Model],
+        raw: JSON,
+        previous_raw: Optional[JSON],
+        previous: Any,
+        only: Optional[Collection[str]],
+        trusted: bool = False,
+    ) -> None:
+        self._model = model
+        self._raw = raw
+        self._only = only
+        self._trusted = trusted
+        self._parsed: Optional[Model] = None
+        if isinstance(previous, Lazy):
+            # Only the last section actually parsed is useful to diff against
+            previous_raw, previous = previous.base
+        self._previous_raw = previous_raw
+        self._previous = previous
+
+    @property
+    def base(self) -> tuple[Optional[JSON], Optional[Model]]:
+        if self._parsed is not None:
+            return self._raw, self._parsed
+        return self._previous_raw, self._previous
+
+    def get(self) -> Model:
+        if self._parsed is None:
+            self._parsed = parse_changed(
+                self._model, self._raw, self._previous_raw, self._previous, self._only, self._trusted,
+            )
+            self._previous_raw = self._previous = None
+        return self._parsed
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+
+# Fields each section should be parsed with, or None for all of them
+Selection = dict[str, Optional[frozenset[str]]]
+
+
+class StreamParser:
+    """Parse successive stream events, only validating what changed since the last one
+
+    Sections left out of select are skipped entirely, and sections named in
+    lazy are only validated the first time they are used. With views, the
+    game schedules are made of GameView rather than Game. Events that were
+    already validated somewhere else can skip validation with trusted.
+    """
+
+    def __init__(
+        self,
+        select: Optional[Selection] = None,
+        lazy: Collection[str] = (),
+        views: bool = False,
+        trusted: bool = False,
+    ) -> None:
+        self.select = select
+        self.lazy = lazy
+        self.trusted = trusted
+        self.raw: JSON = {}
+        self.sections: dict[str, Any] = {}
+
+        self.schedules: frozenset[str] = frozenset()
+        self.views: dict[str, tuple[JSON, ModelView]] = {}
+        if views and (select is None or "games" in select):
+            select = select or dict.fromkeys(StreamData.__fields__)
+            games = select["games"] or frozenset(GamesData.__fields__)
+            self.schedules = games & {"schedule", "tomorrow_schedule"}
+            self.select = {**select, "games": games - self.schedules}
+
+    def parse(self, event: JSON, copy: bool = True) -> StreamData:
+        """Parse the next event
+
+        Without copy, parts of event are kept to compare the next one against,
+        so nothing else may change it afterwards.
+        """
+        sections: dict[str, Any] = {}
+        for field in StreamData.__fields__.values():
+            if self.select is not None and field.name not in self.select:
+                sections[field.name] = None
+                continue
+            only = self.select[field.name] if self.select is not None else None
+
+            value = event.get(field.alias)
+            if value is not None and value == self.raw.get(field.alias):
+                sections[field.name] = self.sections[field.name]
+                continue
+
+            if value is not None and copy:
+                # The stream client may patch the same payload in place for
+                # the next event, so hold on to a copy of it to compare against.
+                value = json.loads(json.dumps(value))
+            if _is_model(field) and isinstance(value, dict):
+                args = (field.type_, value, self.raw.get(field.alias), self.sections.get(field.name), only, self.trusted)
+                if field.name in self.lazy:
+                    sections[field.name] = Lazy(*args)
+                else:
+                    sections[field.name] = parse_changed(*args)
+                if field.name == "games" and self.schedules and isinstance(sections[field.name], GamesData):
+                    self._add_views(value, sections[field.name])
+            else:
+                sections[field.name] = _validate(StreamData, field, value, sections)
+
+            # Sections missing from this event are remembered from earlier ones
+            if value is not None:
+                self.raw[field.alias] = value
+                self.sections[field.name] = sections[field.name]
+
+        return StreamData.construct(**sections)
+
+    def _add_views(self, raw: JSON, games: GamesData) -> None:
+        views: dict[str, tuple[JSON, ModelView]] = {}
+        for name in self.schedules:
+            schedule: list[ModelView] = []
+            for game in raw.get(GamesData.__fields__[name].alias, ()):
+                view: Optional[ModelView]
+                previous_raw, view = self.views.get(game.get("id"), (None, None))
+                if view is None or game != previous_raw:
+                    view = GameView(game)
+                views[game.get("id")] = (game, view)
+                schedule.append(view)
+            setattr(games, name, schedule)
+        self.views = views
@@ -0,0 +1,117 @@
+"""Player records by id, fetched in batches and kept for a while
+
+Looking a player up never waits on the network. A miss, or a record older
+than the TTL, queues the id and hands back whatever we already have, and
+the next flush fetches every queued id with a single database.get_player
+call. start() runs flushes on a background thread shortly after the first
+lookup of a render, so everything asked for in one pass shares a request.
+Use resolve() where waiting for fresh records is fine.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Collection, Optional
+
+from blaseball_mike import database
+
+from models import JSON
+
+UNKNOWN_NAME = "????"
+
+
+class PlayerCache:
+    def __init__(
+        self,
+        size: int = 1024,
+        ttl: float = 300,
+        fetch: Callable[[list[str]], dict[str, JSON]] = database.get_player,
+    ) -> None:
+        self.size = size
+        self.ttl = ttl
+        self.fetch = fetch
+        # None for ids the database didn't have, so they aren't asked for every time
+        self._records: OrderedDict[str, tuple[float, Optional[JSON]]] = OrderedDict()
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def peek(self, player_id: str) -> Optional[JSON]:
+        """Return the record we have for player_id, queueing a fetch if it's missing or stale"""
+        with self._lock:
+            entry = self._records.get(player_id)
+            if entry is None:
+                record = None
+                stale = True
+            else:
+                fetched, record = entry
+                self._records.move_to_end(player_id)
+                stale = time.monotonic() - fetched > self.ttl
+            if stale:
+                self._pending.add(player_id)
+                self._wake.set()
+        return record
+
+    def name(self, player_id: str) -> str:
+        record = self.peek(player_id)
+        return record["name"] if record else UNKNOWN_NAME
+
+    def resolve(self, player_ids: Collection[str]) -> dict[str, JSON]:
+        """Return records for all of player_ids, fetching whatever isn't fresh right now"""
+        for player_id in player_ids:
+            self.peek(player_id)
+        self.flush()
+        with self._lock:
+            entries = {player_id: self._records.get(player_id) for player_id in player_ids}
+        return {
+            player_id: entry[1]
+            for player_id, entry in entries.items() if entry is not None and entry[1] is not None
+        }
+
+    def flush(self) -> None:
+        """Fetch every queued id in one request"""
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            self._wake.clear()
+        if not pending:
+            return
+
+        try:
+            records = self.fetch(sorted(pending))
+        except Exception:
+            # Try again next time round
+            with self._lock:
+                self._pending |= pending
+                self._wake.set()
+            raise
+
+        fetched = time.monotonic()
+        with self._lock:
+            for player_id in pending:
+                # Keep what we had of a player the database no longer returns
+                _, previous = self._records.get(player_id, (fetched, None))
+                self._records[player_id] = (fetched, records.get(player_id, previous))
+                self._records.move_to_end(player_id)
+            while len(self._records) > self.size:
+                self._records.popitem(last=False)
+
+    def start(self, delay: float = 0.1, retry: float = 5) -> None:
+        """Flush in the background, delay seconds after something gets queued"""
+        if self._worker is not None:
+            return
+
+        def work() -> None:
+            while True:
+                self._wake.wait()
+                # Let the rest of this render queue up its lookups too
+                time.sleep(delay)
+                try:
+                    self.flush()
+                except Exception:
+                    time.sleep(retry)
+
+        self._worker = threading.Thread(target=work, name="players", daemon=True)
+        self._worker.start()
+
+
+PLAYERS = PlayerCache()
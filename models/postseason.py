@@ -1,9 +1,9 @@
 from typing import Optional
-from uuid import UUID
 
 from pydantic import validator
 
 from models import FixedModel
+from models.intern import UUID
 
 
 class Playoffs(FixedModel):
@@ -33,16 +33,12 @@ class PlayoffRound(FixedModel):
 
     @validator("winners", pre=True)
     def coerce_none(cls, items):
-        for index, item in enumerate(items):
-            if item == "none":
-                items[index] = None
-        return items
+        # Build a new list so the raw data can still be compared against later
+        return [None if item == "none" else item for item in items]
 
     @validator("games", pre=True)
     def coerce_list_none(cls, items):
-        for index, game_list in enumerate(items):
-            items[index] = cls.coerce_none(game_list)
-        return items
+        return [cls.coerce_none(game_list) for game_list in items]
 
 
 class PlayoffMatchup(FixedModel):
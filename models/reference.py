@@ -0,0 +1,70 @@
+"""Lookup tables that don't change while we're watching, fetched once and kept
+
+The first lookup in a table fetches the whole thing and keeps it for the
+life of the process, so call preload() before a render loop to get that
+out of the way. Given a directory, tables are saved there as well and read
+back on the next start instead of going to the network.
+
+Tarot, StatType and friends are enums in blaseball_mike.tables and never
+need fetching.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Callable, Optional
+
+from blaseball_mike import database
+
+from models import JSON
+
+UNKNOWN_WEATHER: JSON = {
+    "name": "????",
+    "background": "#FFFFFF",
+    "color": "#FFFFFF",
+    "description": "This Weather is unknown",
+}
+
+
+class Table:
+    """A list of records looked up by their position"""
+
+    def __init__(self, name: str, fetch: Callable[[], list[JSON]]) -> None:
+        self.name = name
+        self.fetch = fetch
+        self._rows: Optional[list[JSON]] = None
+
+    def load(self, directory: Optional[Path] = None) -> list[JSON]:
+        if self._rows is None:
+            path = directory / f"{self.name}.json" if directory else None
+            if path and path.exists():
+                with path.open() as table_file:
+                    self._rows = json.load(table_file)
+            else:
+                self._rows = self.fetch()
+                if path:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    temp_path = path.with_suffix(".tmp")
+                    with temp_path.open("w") as table_file:
+                        json.dump(self._rows, table_file)
+                    os.replace(temp_path, path)
+        return self._rows
+
+    def get(self, id_: int, default: JSON) -> JSON:
+        rows = self.load()
+        if 0 <= id_ < len(rows):
+            return rows[id_]
+        return default
+
+
+WEATHER = Table("weather", database.get_weather)
+TABLES = [WEATHER]
+
+
+def preload(directory: Optional[Path] = None) -> None:
+    """Load every table now, from directory if they were saved there before"""
+    for table in TABLES:
+        table.load(directory)
+
+
+def weather_name(id_: int) -> str:
+    return WEATHER.get(id_, UNKNOWN_WEATHER)["name"]
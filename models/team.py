@@ -1,10 +1,9 @@
 from typing import Optional
-from uuid import UUID
 
 from blaseball_mike import tables
-from pydantic.color import Color
 
 from models import FixedModel
+from models.intern import UUID, Color, Name
 
 
 class ItemStat(FixedModel):
@@ -119,8 +118,8 @@ class StadiumState(FixedModel):
 class Stadium(FixedModel):
     id: UUID
     team_id: UUID
-    name: str
-    nickname: str
+    name: Name
+    nickname: Name
     model: int
     main_color: Color
     secondary_color: Color
@@ -169,13 +168,13 @@ class Team(FixedModel):
     lineup: list[UUID]
     rotation: list[UUID]
     shadows: list[UUID]
-    full_name: str
-    nickname: str
-    location: str
+    full_name: Name
+    nickname: Name
+    location: Name
     main_color: Color
     secondary_color: Color
-    shorthand: str
-    emoji: str
+    shorthand: Name
+    emoji: Name
     slogan: str
     shame_runs: int
     total_shames: int
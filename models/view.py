@@ -0,0 +1,69 @@
+"""Read-only stand-ins for models that keep the raw JSON and validate fields on access
+
+A view has the same attributes as the model it is made from, but costs next
+to nothing to build and only pays for the fields that actually get read.
+Unlike the model, unknown keys in the raw data are not checked.
+"""
+from typing import Any, Optional
+
+from pydantic.fields import ModelField
+
+from models import JSON, FixedModel, _validate
+
+
+class _ViewField:
+    """Validate a field from the raw data the first time it is read and keep it in a slot"""
+
+    def __init__(self, model: type[FixedModel], field: ModelField, slot: Any) -> None:
+        self.model = model
+        self.field = field
+        self.slot = slot
+
+    def __get__(self, view: Optional["ModelView"], owner: type) -> Any:
+        if view is None:
+            return self
+        try:
+            return self.slot.__get__(view, owner)
+        except AttributeError:
+            pass
+
+        field = self.field
+        if field.alias in view._raw:
+            value = _validate(self.model, field, view._raw[field.alias], {})
+        elif field.required:
+            raise AttributeError(f"{owner.__name__} has no {field.name}")
+        else:
+            value = field.get_default()
+        self.slot.__set__(view, value)
+        return value
+
+    def __set__(self, view: "ModelView", value: Any) -> None:
+        raise AttributeError(f"{self.field.name} is read-only")
+
+
+class ModelView:
+    __slots__ = ("_raw",)
+    model: type[FixedModel]
+
+    def __init__(self, raw: JSON) -> None:
+        self._raw = raw
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self._raw.get('id')!r})"
+
+
+def view_of(model: type[FixedModel]) -> type[ModelView]:
+    """Make a view class with the fields and properties of model"""
+    namespace: dict[str, Any] = {
+        "__slots__": tuple(f"_{name}" for name in model.__fields__),
+        "__doc__": f"Read-only {model.__name__} backed by its raw JSON",
+        "model": model,
+    }
+    for name, attribute in vars(model).items():
+        if isinstance(attribute, property):
+            namespace[name] = attribute
+    view = type(f"{model.__name__}View", (ModelView,), namespace)
+
+    for name, field in model.__fields__.items():
+        setattr(view, name, _ViewField(model, field, vars(view)[f"_{name}"]))
+    return view
@@ -0,0 +1,96 @@
+"""Write the site's data files, along with compressed copies to serve as they are
+
+Every file is written to a temporary name and renamed into place, and the
+compressed copies go in before the file itself, so the site never sees a
+partly written file or a copy older than the file it sits next to.
+"""
+import gzip
+import os
+from pathlib import Path
+from typing import Callable, Optional
+
+from party import shared
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# The suffix added to a file's name for each Content-Encoding, best first
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {
+    "gzip": lambda data: gzip.compress(data, compresslevel=9, mtime=0),
+}
+if brotli is not None:
+    COMPRESSORS["br"] = brotli.compress
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    temp_path = path.with_name(f"{path.name}.tmp")
+    with open(temp_path, "wb") as temp_file:
+        temp_file.write(data)
+    os.replace(temp_path, path)
+
+
+def encoded_path(path: Path, encoding: str) -> Path:
+    return path.with_name(path.name + SUFFIXES[encoding])
+
+
+def write_data(path: Path, text: str) -> None:
+    """Write a file and its compressed copies"""
+    data = text.encode()
+    for encoding, compress in COMPRESSORS.items():
+        write_atomic(encoded_path(path, encoding), compress(data))
+    write_atomic(path, data)
+
+
+def shard_directory(path: Path) -> Path:
+    """Where the shards of a season's table go, next to the table itself"""
+    return path.with_suffix("")
+
+
+def index_path(path: Path) -> Path:
+    """Where the index of a season's shards goes
+
+    It's kept out of their directory, where it could be taken for one of them.
+    """
+    return path.with_suffix(".index.json")
+
+
+def publish_shards(
+    directory: Path,
+    table: str,
+    season_no: Optional[int],
+    shards: dict[str, str],
+    index: Optional[str] = None,
+) -> Path:
+    """Write a season's table in pieces as well, one file for each, and an index of them
+
+    These should go in before the table is published, so they are all there
+    by the time table.json points at the season.
+    """
+    json_file_path = directory / f"{table}.{season_no}.json"
+    shard_path = shard_directory(json_file_path)
+    shard_path.mkdir(exist_ok=True)
+    for name, text in shards.items():
+        write_data(shard_path / f"{name}.json", text)
+    if index is not None:
+        write_data(index_path(json_file_path), index)
+    return shard_path
+
+
+def publish(directory: Path, table: str, season_no: Optional[int], text: str) -> Path:
+    """Write a season's table and point table.json at it"""
+    json_file_path = directory / f"{table}.{season_no}.json"
+    write_data(json_file_path, text)
+
+    if season_no is not None:
+        # Atomically replace existing symlink
+        temp_link = directory / f"{table}.tmp"
+        temp_link.unlink(missing_ok=True)
+        temp_link.symlink_to(json_file_path)
+        final_link = directory / f"{table}.json"
+        temp_link.replace(final_link)
+    # Pages of the old data won't be wanted again
+    shared.clear(shared.configured_path())
+    return json_file_path
@@ -0,0 +1,156 @@
+"""Rendered pages shared by every worker serving the site
+
+uWSGI runs the site in several processes, and rather than each of them
+rendering and holding its own copy of every page, pages go into a single
+memory-mapped file that all of them map. It is an append-only log of keys
+and values behind a small header:
+
+    version  u64  bumped whenever the log is cleared
+    used     u64  bytes of the file in use, header included
+
+Appends happen under an flock, and used only moves past a record once it is
+all there. The header is read under the same lock, as its two values can't
+be written at once and one without the other would point at the wrong
+records. Each worker indexes records as it comes across them, and starts
+over when the version changes. The log is cleared when it fills up, and by
+the writers when they publish new data, so it doesn't fill up with pages
+of data that's gone. A value is only returned if the version is the same
+after copying it out as before, so one cleared and overwritten in the
+meantime is never seen.
+"""
+import fcntl
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+PATH = Path("/dev/shm/blaseball-pages")
+SIZE = 64 * 1024 * 1024
+HEADER = struct.Struct("<QQ")
+# Key length and value length
+RECORD = struct.Struct("<II")
+
+
+class SharedPages:
+    def __init__(self, path: Union[str, Path] = PATH, size: int = SIZE) -> None:
+        self.path = Path(path)
+        self.size = size
+        self._pid: Optional[int] = None
+        self._open()
+
+    def _open(self) -> None:
+        # Each process needs its own file description, or their locks wouldn't
+        # keep each other out.
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o660)
+        with self._locked():
+            if os.fstat(self._fd).st_size < self.size:
+                os.ftruncate(self._fd, self.size)
+        self._map = mmap.mmap(self._fd, 0)
+        self._pid = os.getpid()
+        self._version: Optional[int] = None
+        self._index: dict[str, tuple[int, int]] = {}
+        self._scanned = HEADER.size
+
+    def _check_process(self) -> None:
+        """Open everything again after a fork"""
+        if self._pid != os.getpid():
+            self._open()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _header(self) -> tuple[int, int]:
+        """The version and bytes used, which only hold together under the lock"""
+        version, used = HEADER.unpack_from(self._map, 0)
+        # A new file is all zeroes
+        return version, min(max(used, HEADER.size), len(self._map))
+
+    def _refresh(self) -> int:
+        """Index the records added since last time, and return the version"""
+        with self._locked():
+            version, used = self._header()
+        if version != self._version:
+            self._version = version
+            self._index = {}
+            self._scanned = HEADER.size
+
+        offset = self._scanned
+        while offset + RECORD.size <= used:
+            key_length, value_length = RECORD.unpack_from(self._map, offset)
+            start = offset + RECORD.size
+            end = start + key_length + value_length
+            if end > used:
+                break
+            key = self._map[start:start + key_length].decode(errors="replace")
+            self._index[key] = (start + key_length, value_length)
+            offset = end
+        self._scanned = offset
+
+        if HEADER.unpack_from(self._map, 0)[0] != version:
+            # Cleared while reading, so what was read may be nonsense
+            self._version = None
+            return self._refresh()
+        return version
+
+    def get(self, key: str) -> Optional[bytes]:
+        self._check_process()
+        version = self._refresh()
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        offset, length = entry
+        value = self._map[offset:offset + length]
+        if HEADER.unpack_from(self._map, 0)[0] != version:
+            return None
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self._check_process()
+        key_bytes = key.encode()
+        size = RECORD.size + len(key_bytes) + len(value)
+        if HEADER.size + size > len(self._map):
+            # Too big to share at all
+            return
+
+        with self._locked():
+            version, used = self._header()
+            if used + size > len(self._map):
+                # Full, so start again. The version goes up before anything is
+                # overwritten, for anyone reading at the time to notice.
+                version += 1
+                used = HEADER.size
+                HEADER.pack_into(self._map, 0, version, used)
+            RECORD.pack_into(self._map, used, len(key_bytes), len(value))
+            start = used + RECORD.size
+            self._map[start:start + len(key_bytes)] = key_bytes
+            self._map[start + len(key_bytes):used + size] = value
+            HEADER.pack_into(self._map, 0, version, used + size)
+
+    def clear(self) -> None:
+        self._check_process()
+        with self._locked():
+            version, _ = self._header()
+            HEADER.pack_into(self._map, 0, version + 1, HEADER.size)
+
+
+def configured_path() -> Path:
+    """Where pages are shared, which FLASK_SHARED_PAGES sets for the writers as well as the site"""
+    return Path(os.environ.get("FLASK_SHARED_PAGES", PATH))
+
+
+def clear(path: Union[str, Path] = PATH) -> None:
+    """Tell the workers there's new data, dropping the pages of the old"""
+    if not Path(path).exists():
+        return
+    try:
+        SharedPages(path).clear()
+    except OSError:
+        # No workers this can reach, so nothing to tell
+        pass
@@ -1,58 +1,293 @@
 import json
-from datetime import datetime
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, NamedTuple, Optional, Union
 
-from flask import Flask, render_template, request
+from flask import Flask, Response, abort, render_template, request, send_file
 from flask_caching import Cache
 
+from party import shared
+from party.publish import SUFFIXES, encoded_path, index_path, shard_directory
+from party.shared import SharedPages
+
 app = Flask(__name__)
-cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache'})  # dead: disable
+# FLASK_X_ACCEL_REDIRECT and FLASK_USE_X_SENDFILE hand data files off to the web server,
+# and FLASK_SHARED_PAGES moves the file rendered pages are shared between workers in
+app.config.from_prefixed_env()
+cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache'})
 data_path = Path("/srv/blaseball")
 
+# A data file as (inode, mtime, size), which changes whenever it is written
+Stamp = tuple[int, int, int]
+
+
+class DataFile(NamedTuple):
+    path: Path
+    stamp: Stamp
+    modified: datetime
+    # Compressed copies the writer left next to the file, best first
+    encodings: list[str]
+
+    @property
+    def etag(self) -> str:
+        return "{:x}-{:x}-{:x}".format(*self.stamp)
+
+
+class Bundle(NamedTuple):
+    file: DataFile
+    data: dict[str, Any]
+
+
+_bundles: dict[tuple[str, Optional[int], Optional[str]], Bundle] = {}
+SPLITS = ("pitchers", "weather", "stadia", "others")
+
 
 @app.route("/")
-def show_standings() -> str:  # dead: disable
+def show_standings() -> Response:  # dead: disable
     season_number = request.args.get("season", default=None, type=int)
-    standings_json = show_standings_json(season_number)
-    if standings_json:
-        bundle = json.loads(standings_json)
-        bundle["season_param"] = season_number
-        bundle["updated"] = datetime.fromisoformat(bundle["updated"])
+    data_file = locate("standings", season_number)
+    if data_file is None:
+        abort(404)
+
+    def render() -> str:
+        return render_template("standings.j2", **load_data("standings", season_number), season_param=season_number)
 
-    return render_template("standings.j2", **bundle)
+    return cached_page(data_file, f"standings:{season_number}", render)
 
 
 @app.route("/standings.json")
-def show_standings_json(season_no: Optional[int] = None) -> str:
-    return load_json("standings", season_no)
+def show_standings_json() -> Response:
+    return send_data(locate("standings", request.args.get("season", default=None, type=int)))
 
 
 @app.route("/teams/<string:team_id>")
-def show_team_stats(team_id: str) -> str:  # dead: disable
+def show_team_stats(team_id: str) -> Response:  # dead: disable
+    season_number = request.args.get("season", default=None, type=int)
+    shard: Optional[str] = team_id
+    data_file = locate("teams", season_number, shard)
+    if data_file is None:
+        # Seasons written before there were shards
+        shard = None
+        data_file = locate("teams", season_number)
+    if data_file is None:
+        abort(404)
+
+    def render() -> str:
+        data = load_data("teams", season_number, shard)
+        team_data = {team_id: data["team"]} if shard else data["team_data"]
+        if team_id not in team_data:
+            abort(404)
+        return render_template(
+            "team.j2",
+            updated=data["updated"],
+            season=data["season"],
+            team_data=team_data,
+            team_id=team_id,
+            season_param=season_number,
+        )
+
+    return cached_page(data_file, f"teams:{season_number}:{team_id}", render)
+
+
+@app.route("/teams/index.json")
+def show_teams_index() -> Response:
+    data_file = locate("teams", request.args.get("season", default=None, type=int), index=True)
+    if data_file is None:
+        abort(404)
+    return send_data(data_file)
+
+
+@app.route("/teams/<string:team_id>/record.json")
+def show_team_record(team_id: str) -> Response:
+    data_file = locate("teams", request.args.get("season", default=None, type=int), team_id)
+    if data_file is None:
+        abort(404)
+    return send_data(data_file)
+
+
+@app.route(f"/teams/<string:team_id>/<any({', '.join(SPLITS)}):split>.json")
+def show_team_split(team_id: str, split: str) -> Response:
     season_number = request.args.get("season", default=None, type=int)
-    teams_json = show_teams_json(season_number)
-    if teams_json:
-        bundle = json.loads(teams_json)
-        bundle["team_id"] = team_id
-        bundle["season_param"] = season_number
-        bundle["updated"] = datetime.fromisoformat(bundle["updated"])
+    data_file = locate("teams", season_number, team_id)
+    if data_file is None:
+        abort(404)
+
+    def render() -> str:
+        return json.dumps(load_data("teams", season_number, team_id)["team"][split])
 
-    return render_template("team.j2", **bundle)
+    return cached_page(data_file, f"teams:{season_number}:{team_id}:{split}", render, "application/json")
+
+
+@app.route("/teams/<string:team_id>/others/<string:other_id>.json")
+def show_team_opponent(team_id: str, other_id: str) -> Response:
+    season_number = request.args.get("season", default=None, type=int)
+    data_file = locate("teams", season_number, team_id)
+    if data_file is None:
+        abort(404)
+
+    def render() -> str:
+        others = load_data("teams", season_number, team_id)["team"]["others"]
+        if other_id not in others:
+            abort(404)
+        return json.dumps(others[other_id])
+
+    return cached_page(data_file, f"teams:{season_number}:{team_id}:others:{other_id}", render, "application/json")
 
 
 @app.route("/teams.json")
-def show_teams_json(season_no: Optional[int] = None):
-    return load_json("teams", season_no)
+def show_teams_json() -> Response:
+    return send_data(locate("teams", request.args.get("season", default=None, type=int)))
+
 
+def locate(
+    table: str,
+    season_no: Optional[int] = None,
+    shard: Optional[str] = None,
+    index: bool = False,
+) -> Optional[DataFile]:
+    """The file a table, one shard of it or the index of its shards, is in right now
 
-def load_json(table: str, season_no: Optional[int] = None) -> str:
+    Following the symlink means a writer swapping it to a new file is
+    picked up on the next request, along with the shards next to it.
+    """
     dest = data_path / f"{table}.json"
     if season_no is not None:
         dest = data_path / f"{table}.{season_no}.json"
 
     try:
-        with open(dest) as json_file:
-            return json_file.read()
+        dest = dest.resolve(strict=True)
+        if index:
+            dest = index_path(dest)
+        elif shard is not None:
+            dest = shard_directory(dest) / f"{shard}.json"
+        stat = dest.stat()
     except FileNotFoundError:
-        return ""
+        return None
+
+    encodings = []
+    for encoding in SUFFIXES:
+        try:
+            # One newer than the file is from a write still going on
+            if os.stat(encoded_path(dest, encoding)).st_mtime_ns <= stat.st_mtime_ns:
+                encodings.append(encoding)
+        except FileNotFoundError:
+            pass
+    return DataFile(
+        path=dest,
+        stamp=(stat.st_ino, stat.st_mtime_ns, stat.st_size),
+        modified=datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+        encodings=encodings,
+    )
+
+
+def load_bundle(table: str, season_no: Optional[int] = None, shard: Optional[str] = None) -> Optional[Bundle]:
+    """The data in a table's file, only read again once the file has changed"""
+    data_file = locate(table, season_no, shard)
+    if data_file is None:
+        return None
+    cached = _bundles.get((table, season_no, shard))
+    if cached and cached.file.stamp == data_file.stamp:
+        return cached
+
+    try:
+        with open(data_file.path) as json_file:
+            data = json.load(json_file)
+    except FileNotFoundError:
+        return None
+    except json.JSONDecodeError:
+        # Caught halfway through being written, the last complete one will do
+        return cached
+
+    data["updated"] = datetime.fromisoformat(data["updated"])
+    bundle = Bundle(data_file, data)
+    _bundles[table, season_no, shard] = bundle
+    return bundle
+
+
+def load_data(table: str, season_no: Optional[int] = None, shard: Optional[str] = None) -> dict[str, Any]:
+    bundle = load_bundle(table, season_no, shard)
+    if bundle is None:
+        abort(404)
+    return bundle.data
+
+
+def conditional(response: Response, etag: str, modified: datetime) -> Response:
+    """Answer with 304 Not Modified if the client has this version already"""
+    response.set_etag(etag)
+    response.last_modified = modified
+    # Changes the response in place, so it stays a Flask one
+    response.make_conditional(request)
+    return response
+
+
+def accel_path(path: Path) -> Optional[str]:
+    """Where nginx can find a data file, if it is set up to send them"""
+    location = app.config.get("X_ACCEL_REDIRECT")
+    if not location:
+        return None
+    try:
+        relative = path.relative_to(data_path.resolve())
+    except ValueError:
+        return None
+    return f"{location.rstrip('/')}/{relative.as_posix()}"
+
+
+def send_data(data_file: Optional[DataFile]) -> Response:
+    """A data file straight from disk, compressed if the client takes that
+
+    The file is never read in here. With X_ACCEL_REDIRECT set to the
+    internal nginx location serving data_path, nginx sends it, picking the
+    compressed copy with gzip_static, and handles ranges and revalidation.
+    Otherwise send_file passes it to the server to send, or just names it
+    in an X-Sendfile header with USE_X_SENDFILE.
+    """
+    if data_file is None:
+        abort(404)
+
+    accel = accel_path(data_file.path)
+    if accel:
+        response = Response(mimetype="application/json")
+        response.headers["X-Accel-Redirect"] = accel
+        return response
+
+    encoding = request.accept_encodings.best_match(data_file.encodings)
+    path = data_file.path
+    etag = data_file.etag
+    if encoding:
+        path = encoded_path(path, encoding)
+        etag = f"{etag}-{encoding}"
+    response = send_file(path, mimetype="application/json", etag=etag, last_modified=data_file.modified)
+    if encoding:
+        response.content_encoding = encoding
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+@lru_cache(maxsize=None)
+def page_store() -> Union[SharedPages, Cache]:
+    """Where rendered pages are kept, shared between workers if possible"""
+    try:
+        return SharedPages(app.config.get("SHARED_PAGES", shared.PATH))
+    except OSError:
+        # Nowhere to share them, so each worker keeps its own
+        return cache
+
+
+def cached_page(data_file: DataFile, page: str, render: Callable[[], str], mimetype: str = "text/html") -> Response:
+    """A page rendered from a data file, rendered again only when the file changes
+
+    Nothing is read from the file unless the page has to be rendered.
+    """
+    etag = f"{data_file.etag}-{mimetype.rpartition('/')[2]}"
+    if request.if_none_match.contains(etag):
+        return conditional(Response(), etag, data_file.modified)
+
+    key = f"{page}:{etag}"
+    pages = page_store()
+    body = pages.get(key)
+    if body is None:
+        body = render().encode()
+        pages.set(key, body)
+    return conditional(Response(body, mimetype=mimetype), etag, data_file.modified)
@@ -1,7 +1,9 @@
 from dataclasses import dataclass, field
 from typing import Any, NamedTuple
 
-from blaseball_mike import chronicler, database, tables
+from blaseball_mike import chronicler, database
+
+from models import reference
 
 TEAMS = {
     team_id: team["nickname"]
@@ -103,7 +105,7 @@ def collect_records(season: int) -> dict[str, Any]:
         home = data["homeTeam"]
         away = data["awayTeam"]
         is_home_win = data["homeScore"] > data["awayScore"]
-        weather = tables.Weather(data["weather"]).name
+        weather = reference.weather_name(data["weather"])
 
         games_by_team.record_game(
             team_id=home,
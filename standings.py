@@ -5,6 +5,7 @@ from datetime import datetime, timezone
 from blaseball_mike import models
 
 from party import season
+from party.publish import publish
 from party.site import data_path
 
 
@@ -25,17 +26,7 @@ def main(season_no=None):
         "season": season_no,
         "standings": standings,
     }
-    json_file_path = data_path / f"standings.{season_no}.json"
-    with open(json_file_path, "w") as json_file:
-        json.dump(bundle, json_file)
-
-    if season_no is not None:
-        # Atomically replace existing symlink
-        temp_link = data_path / "standings.tmp"
-        temp_link.unlink(missing_ok=True)
-        temp_link.symlink_to(json_file_path)
-        final_link = data_path / "standings.json"
-        temp_link.replace(final_link)
+    publish(data_path, "standings", season_no, json.dumps(bundle))
 
 
 if __name__ == "__main__":
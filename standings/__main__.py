@@ -1,30 +1,109 @@
+import argparse
 import asyncio
+import json
+from functools import partial
+from pathlib import Path
+from typing import Callable, Optional
 
-from blaseball_mike.events import stream_events
 from rich.live import Live
+from rich.text import Text
 
-from models.live import StreamData
+from models.game import GamesData
+from models.league import LeagueData
+from models.live import Selection, StreamParser
 from standings import display, postseason, season
+from standings.elimination import Brackets, Solver
+from standings.simulate import SIMULATIONS, simulate
+from stream import source
+from stream.pipeline import Pipeline, Stage
+from stream.snapshot import Snapshot
+
+SECTIONS: Selection = {
+    "games": frozenset({"sim", "standings", "postseasons", "schedule", "tomorrow_schedule"}),
+    "leagues": frozenset({"leagues", "subleagues", "divisions", "teams", "tiebreakers"}),
+}
 
 
 async def main() -> None:
-    leagues = None
-    with Live(display.layout, auto_refresh=False) as live:
-        async for event in stream_events():
-            stream_data = StreamData.parse_obj(event)
+    arg_parser = argparse.ArgumentParser(description="Show live Blaseball standings")
+    arg_parser.add_argument("--odds", action="store_true", help="Simulate the rest of the season for party and postseason odds")
+    arg_parser.add_argument("-n", "--simulations", type=int, default=SIMULATIONS)
+    arg_parser.add_argument("--snapshot", type=Path, help="File to keep the latest data in, to show straight away next run")
+    source.add_arguments(arg_parser)
+    arg_parser.add_argument("--fps", type=float, default=4, help="Most frames to draw a second")
+    arg_parser.add_argument("--debug", action="store_true", help="Show how each stage is doing")
+    args = arg_parser.parse_args()
+
+    solver = Solver()
+    tracker = season.Tracker()
+    magic: dict[str, Brackets] = {}
+    odds = None
+    snapshot = Snapshot(args.snapshot) if args.snapshot else None
+    parser = StreamParser(SECTIONS, lazy={"leagues"}, views=True, trusted=bool(args.hub))
+    leagues: Optional[LeagueData] = None
+
+    def parse(text: str) -> Optional[tuple[LeagueData, GamesData]]:
+        nonlocal leagues
+        stream_data = parser.parse(json.loads(text), copy=False)
+        if snapshot:
+            snapshot.update(parser.raw)
+        if stream_data.leagues:
+            leagues = stream_data.leagues
+        if stream_data.games and leagues is not None:
+            return leagues, stream_data.games
+        return None
 
-            if stream_data.leagues:
-                leagues = stream_data.leagues
+    def compute(state: tuple[LeagueData, GamesData]) -> Optional["partial[None]"]:
+        nonlocal magic, odds
+        leagues, games = state
+        if games.sim.day >= 99:
+            postseason_data = postseason.get_playoffs(games, leagues)
+            return partial(display.update_postseason, postseason_data)
 
-            if (games := stream_data.games) and leagues is not None:
-                if games.sim.day < 99:
-                    game_data = season.get_standings(games, leagues)
-                    display.update_standings(game_data, games.sim)
-                else:
-                    postseason_data = postseason.get_playoffs(games, leagues)
-                    display.update_postseason(postseason_data)
+        changed = tracker.update(games, leagues)
+        previous, magic = magic, solver.solve(games, leagues)
+        changed.update(
+            subleague for subleague, rows in tracker.predictions.items()
+            if any(magic.get(row.id) != previous.get(row.id) for row in rows)
+        )
+        if not changed:
+            # Mid-game update, nothing on screen would move
+            return None
+        if args.odds:
+            odds = simulate(games, leagues, args.simulations)
+            changed = set(tracker.predictions)
+        return partial(
+            display.update_standings, dict(tracker.predictions), games.sim, odds, magic, subleagues=changed,
+        )
 
-            live.refresh()
+    def merge(dropped: "partial[None]", update: "partial[None]") -> "partial[None]":
+        # A subleague only the dropped redraw had changed still needs drawing
+        if dropped.func is update.func is display.update_standings:
+            return partial(update, subleagues=dropped.keywords["subleagues"] | update.keywords["subleagues"])
+        return update
+
+    def draw(update: Callable[[], None]) -> None:
+        update()
+        if args.debug:
+            display.layout["footer"].update(Text(pipeline.report(), style="dim"))
+        live.refresh()
+
+    pipeline = Pipeline(
+        Stage("parse", parse),
+        Stage("compute", compute),
+        Stage("draw", draw, fps=args.fps, merge=merge),
+    )
+    with Live(display.layout, auto_refresh=False) as live:
+        # The stream client patches the same payload in place, so take a copy
+        # before reading on, and leave the parsing to the first stage.
+        events = source.open_stream(args)
+        if snapshot:
+            events = snapshot.events(events)
+        try:
+            await pipeline.run(events, json.dumps)
+        finally:
+            if snapshot:
+                snapshot.save(dict(parser.raw))
 
 
 if __name__ == "__main__":
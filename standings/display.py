@@ -1,11 +1,15 @@
+from typing import Collection, Optional
+
 from rich.layout import Layout
 from rich.panel import Panel
 from rich.table import Table
 from rich.text import Text
 
 from models.game import SimData
+from standings import elimination
 from standings.postseason import Brackets
 from standings.season import Prediction
+from standings.simulate import Odds
 
 BRACKETS = ("overbracket", "underbracket")
 
@@ -46,11 +50,28 @@ def clip_championships(row) -> str:
     return championships
 
 
-def update_standings(data: Prediction, sim: SimData) -> None:
+def format_odds(odds: float, never: str, always: str) -> str:
+    if odds < 0.005:
+        return never
+    if odds > 0.995:
+        return always
+    return f"{odds * 100:.0f}"
+
+
+def update_standings(
+    data: Prediction,
+    sim: SimData,
+    odds: Optional[dict[str, Odds]] = None,
+    magic: Optional[dict[str, elimination.Brackets]] = None,
+    subleagues: Optional[Collection[str]] = None,
+) -> None:
+    """Redraw the standings, only for the named subleagues if given"""
     layout["header"].update(
         Text(f"Season {sim.season + 1} Day {sim.day + 1}", justify="center")
     )
     for subleague, rows in data.items():
+        if subleagues is not None and subleague not in subleagues:
+            continue
         teams = []
         for row in rows:
 
@@ -75,6 +96,37 @@ def update_standings(data: Prediction, sim: SimData) -> None:
             else:
                 party = str(row.party)
 
+            if magic and row.id in magic:
+                # Magic numbers count games rather than days, so they say
+                # which: losses until the party, wins to clinch the
+                # overbracket, or losses to clinch the underbracket.
+                over, under = magic[row.id]
+                if over.elimination is not None:
+                    party = f"{over.elimination}L"
+                clinch = []
+                if over.clinch is not None:
+                    clinch.append(f"{over.clinch}W")
+                if under.clinch is not None:
+                    clinch.append(f"{under.clinch}L")
+                if clinch:
+                    postseason = " ".join(clinch)
+
+            if odds and row.id in odds:
+                party = format_odds(odds[row.id].party, "😐", "🥳")
+                postseason = format_odds(odds[row.id].playoffs, "", "👑")
+
+            if magic and row.id in magic:
+                # Settled is settled, whatever the guesses above say
+                over, under = magic[row.id]
+                if over.eliminated:
+                    party = "🥳"
+                elif over.clinched:
+                    party = "😐"
+                if over.clinched or under.clinched:
+                    postseason = "👑"
+                elif over.eliminated and under.eliminated:
+                    postseason = ""
+
             teams.append((
                 row.division.split()[1][0],
                 Text.assemble((row.name, row.color), f"[{row.tiebreaker}]"),
@@ -94,8 +146,8 @@ def update_standings(data: Prediction, sim: SimData) -> None:
             table.add_column("Wins", width=3, justify="right")
             table.add_column("WANG", width=3, justify="right")
             table.add_column("Record", width=5, justify="right")
-            table.add_column("Party", width=2, justify="right")
-            table.add_column("Postseason", width=2, justify="right")
+            table.add_column("Party", width=4, justify="right")
+            table.add_column("Postseason", width=7, justify="right")
             slice_size = len(teams) // len(BRACKETS)
             for team in teams[i * slice_size:(i + 1) * slice_size]:
                 table.add_row(*team)
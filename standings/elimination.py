@@ -0,0 +1,280 @@
+"""Exact clinch and elimination numbers for the postseason brackets
+
+This is the classic baseball elimination problem: a team is eliminated if
+no way of playing out the remaining games gets it in, and whether a given
+set of rivals can be kept below a team comes down to a max-flow of the
+games they still play against each other into how many wins each of them
+can afford.
+
+The overbracket of a subleague is both division winners and the next two
+best teams, so a team gets in if it finishes ahead of its whole division,
+behind at most two teams, or behind exactly three as long as one of them
+is from the other division. The underbracket is the same thing from the
+bottom, so it's solved by swapping wins for losses and reversing the
+tiebreakers.
+
+Only today's and tomorrow's matchups are known. Any other remaining game
+is treated as one the team may win or lose freely, which can only err
+towards calling things later than they happen, never too early.
+"""
+from collections import deque
+from itertools import combinations
+from typing import Hashable, NamedTuple, Optional
+
+from models.game import GamesData
+from models.league import LeagueData
+
+SEASON_LENGTH = 99
+BRACKET_SIZE = 4
+
+Matchup = tuple[int, int]
+
+
+class Magic(NamedTuple):
+    clinched: bool
+    eliminated: bool
+    # Wins the team needs to clinch, if it can still clinch on its own
+    clinch: Optional[int]
+    # Losses that would eliminate the team, if it isn't eliminated yet
+    elimination: Optional[int]
+
+
+class Brackets(NamedTuple):
+    overbracket: Magic
+    underbracket: Magic
+
+
+def max_flow(capacity: dict[Hashable, dict[Hashable, int]], source: Hashable, sink: Hashable) -> int:
+    """Edmonds-Karp over a graph of residual capacities, which is used up in the process"""
+    for node, edges in list(capacity.items()):
+        for other in edges:
+            capacity.setdefault(other, {}).setdefault(node, 0)
+
+    flow = 0
+    while True:
+        parents = {source: source}
+        queue = deque([source])
+        while queue and sink not in parents:
+            node = queue.popleft()
+            for other, left in capacity[node].items():
+                if left > 0 and other not in parents:
+                    parents[other] = node
+                    queue.append(other)
+        if sink not in parents:
+            return flow
+
+        path = []
+        node = sink
+        while node != source:
+            path.append((parents[node], node))
+            node = parents[node]
+        pushed = min(capacity[a][b] for a, b in path)
+        for a, b in path:
+            capacity[a][b] -= pushed
+            capacity[b][a] += pushed
+        flow += pushed
+
+
+def _assignable(games: list[Matchup], room: dict[int, int]) -> bool:
+    """Whether every game can be won by one of its teams without anyone going over their room"""
+    if not games:
+        return True
+    capacity: dict[Hashable, dict[Hashable, int]] = {"source": {}}
+    for number, (a, b) in enumerate(games):
+        capacity["source"][("game", number)] = 1
+        capacity[("game", number)] = {a: 1, b: 1}
+    for team, wins in room.items():
+        capacity.setdefault(team, {})["sink"] = max(wins, 0)
+    return max_flow(capacity, "source", "sink") == len(games)
+
+
+class Subleague(NamedTuple):
+    """Everything about a subleague the brackets depend on, by position"""
+    wins: tuple[int, ...]
+    remaining: tuple[int, ...]
+    ranks: tuple[int, ...]
+    divisions: tuple[int, ...]
+    games: tuple[Matchup, ...]
+
+    def mirrored(self) -> "Subleague":
+        """The same subleague ranked from the bottom"""
+        return self._replace(
+            wins=tuple(
+                SEASON_LENGTH - remaining - wins
+                for wins, remaining in zip(self.wins, self.remaining)
+            ),
+            ranks=tuple(-rank for rank in self.ranks),
+        )
+
+    def ahead(self, team: int, rival: int) -> bool:
+        """Whether rival wins a tie with team"""
+        return self.ranks[rival] < self.ranks[team]
+
+    def can_make(self, team: int, ceiling: int) -> bool:
+        """Whether team can still make the bracket finishing with ceiling wins"""
+        rivals = [rival for rival in range(len(self.wins)) if rival != team]
+        room = {
+            rival: ceiling - self.wins[rival] - self.ahead(team, rival)
+            for rival in rivals
+        }
+        # Team wins its own games, everyone else loses all but these
+        games = [game for game in self.games if team not in game]
+        own = self.divisions[team]
+
+        def fits(passing: set[int]) -> bool:
+            if any(room[rival] < 0 for rival in rivals if rival not in passing):
+                return False
+            return _assignable(
+                [game for game in games if not passing.intersection(game)],
+                {rival: room[rival] for rival in rivals if rival not in passing},
+            )
+
+        # Rivals that could pass team at all, the rest never matter
+        played = {rival: sum(rival in game for game in games) for rival in rivals}
+        threats = [rival for rival in rivals if played[rival] > room[rival]]
+        others = {rival for rival in threats if self.divisions[rival] != own}
+
+        if fits(others):
+            # Wins the division
+            return True
+        for size, mixed in ((2, False), (3, True)):
+            if len(threats) <= size and (not mixed or others or len(threats) < size):
+                return fits(set(threats))
+            for passing in combinations(threats, size):
+                if (not mixed or others.intersection(passing)) and fits(set(passing)):
+                    return True
+        return False
+
+    def can_miss(self, team: int, floor: int) -> bool:
+        """Whether team can still miss the bracket finishing with floor wins"""
+        rivals = [rival for rival in range(len(self.wins)) if rival != team]
+        # Team loses its own games, everyone else wins all but these
+        games = [game for game in self.games if team not in game]
+        need = {
+            rival: floor + (not self.ahead(team, rival)) - self.wins[rival]
+            for rival in rivals
+        }
+        free = {
+            rival: self.remaining[rival] - sum(rival in game for game in games)
+            for rival in rivals
+        }
+        short = {rival: need[rival] - free[rival] for rival in rivals}
+        able = [rival for rival in rivals if need[rival] <= self.remaining[rival]]
+        own = [rival for rival in able if self.divisions[rival] == self.divisions[team]]
+
+        def passes(passing: tuple[int, ...]) -> bool:
+            shortfall = {rival: short[rival] for rival in passing if short[rival] > 0}
+            needed = sum(shortfall.values())
+            if not needed:
+                return True
+            # Flip it around: can the games leave everyone else no worse than
+            # they need to be, with each passing team winning what it's short?
+            relevant = [game for game in games if set(game) & set(shortfall)]
+            capacity: dict[Hashable, dict[Hashable, int]] = {"source": {}}
+            for number, (a, b) in enumerate(relevant):
+                capacity["source"][("game", number)] = 1
+                capacity[("game", number)] = {side: 1 for side in (a, b) if side in shortfall}
+            for rival, wins in shortfall.items():
+                capacity.setdefault(rival, {})["sink"] = wins
+            return max_flow(capacity, "source", "sink") >= needed
+
+        passing: tuple[int, ...]
+        for passing in combinations(own, 3):
+            if passes(passing):
+                return True
+        for passing in combinations(able, BRACKET_SIZE):
+            if set(passing) & set(own) and passes(passing):
+                return True
+        return False
+
+    def solve(self, team: int) -> Magic:
+        wins, remaining = self.wins[team], self.remaining[team]
+        eliminated = not self.can_make(team, wins + remaining)
+        clinched = not self.can_miss(team, wins)
+
+        clinch = None
+        if not clinched and not self.can_miss(team, wins + remaining):
+            low, high = 1, remaining
+            while low < high:
+                middle = (low + high) // 2
+                if self.can_miss(team, wins + middle):
+                    low = middle + 1
+                else:
+                    high = middle
+            clinch = low
+
+        elimination = None
+        if not eliminated:
+            low, high = 1, remaining + 1
+            while low < high:
+                middle = (low + high) // 2
+                if self.can_make(team, wins + remaining - middle):
+                    low = middle + 1
+                else:
+                    high = middle
+            elimination = low if low <= remaining else None
+
+        return Magic(
+            clinched=clinched,
+            eliminated=eliminated,
+            clinch=clinch,
+            elimination=elimination,
+        )
+
+
+class Solver:
+    """Keeps the answers for each subleague until something in it changes"""
+
+    def __init__(self) -> None:
+        self._solved: dict[Hashable, tuple[Subleague, list[Brackets]]] = {}
+
+    def solve(self, game_data: GamesData, league_data: LeagueData) -> dict[str, Brackets]:
+        """Return the clinch and elimination state of every team in a division, keyed by team id"""
+        standings = game_data.standings
+        index = league_data.index
+        tiebreak = index.tiebreakers[league_data.leagues[0].tiebreakers]
+        order = {team_id: rank for rank, team_id in enumerate(tiebreak.order)}
+        schedule = [
+            game for game in game_data.schedule + game_data.tomorrow_schedule
+            if not game.game_complete
+        ]
+
+        results = {}
+        for subleague_id, subleague in index.subleagues.items():
+            teams = [
+                (team_id, number)
+                for number, division_id in enumerate(subleague.divisions)
+                if division_id in index.divisions
+                for team_id in index.divisions[division_id].teams
+            ]
+            if len(teams) < BRACKET_SIZE:
+                continue
+            position = {team_id: i for i, (team_id, _) in enumerate(teams)}
+            state = Subleague(
+                wins=tuple(standings.wins.get(team_id, 0) for team_id, _ in teams),
+                remaining=tuple(
+                    max(0, SEASON_LENGTH - standings.games_played.get(team_id, 0))
+                    for team_id, _ in teams
+                ),
+                ranks=tuple(order.get(team_id, len(order)) for team_id, _ in teams),
+                divisions=tuple(division for _, division in teams),
+                games=tuple(
+                    (position[game.away_team], position[game.home_team])
+                    for game in schedule
+                    if game.away_team in position and game.home_team in position
+                ),
+            )
+
+            previous, brackets = self._solved.get(subleague_id, (None, []))
+            if state != previous:
+                # Only subleagues where a game finished or got scheduled
+                mirrored = state.mirrored()
+                brackets = [
+                    Brackets(overbracket=state.solve(team), underbracket=mirrored.solve(team))
+                    for team in range(len(teams))
+                ]
+                self._solved[subleague_id] = (state, brackets)
+
+            for (team_id, _), bracket in zip(teams, brackets):
+                results[str(team_id)] = bracket
+        return results
@@ -31,20 +31,11 @@ Brackets = dict[str, PlayoffStandings]
 
 
 def get_team(league_data: LeagueData, team_id: UUID) -> Team:
-    for team in league_data.teams:
-        if team.id == team_id:
-            return team
-    raise ValueError(f"Team {team_id!s} not found")
+    return league_data.index.teams[team_id]
 
 
 def get_team_subleague(league_data: LeagueData, team_id: UUID) -> Subleague:
-    for subleague in league_data.subleagues:
-        for division in league_data.divisions:
-            if division.id not in subleague.divisions:
-                continue
-            if team_id in division.teams:
-                return subleague
-    raise ValueError(f"Team {team_id!s} not found")
+    return league_data.index.team_subleague[team_id]
 
 
 def get_playoffs(game_data: GamesData, league_data: LeagueData) -> Brackets:
@@ -1,8 +1,9 @@
 from collections import defaultdict
-from typing import Dict, List, NamedTuple, Optional, Union
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional
+from uuid import UUID
 
 from models.game import GamesData, Standings
-from models.league import Division, LeagueData, Subleague, Tiebreakers
+from models.league import Division, LeagueData, Subleague
 from models.team import Team
 
 
@@ -27,47 +28,20 @@ class Row(NamedTuple):
 
 Prediction = Dict[str, List[Row]]
 ATeam = tuple[Team, Subleague, Division]
+Ranks = dict[UUID, int]
 
 
-def format_row(ateam: ATeam, other_teams: list[ATeam], day: int, standings: Standings, tiebreak: Tiebreakers) -> Row:
-    team, subleague, division = ateam
-    subleague_teams = [t for t in other_teams if t[1] == ateam[1]]
-    division_teams = [t for t in subleague_teams if t[2] == ateam[2]]
-    nondivision_teams = [t for t in subleague_teams if t not in division_teams]
-
-    overbracket = [division_teams[0], nondivision_teams[0]]
-    for t in subleague_teams:
-        if t not in overbracket:
-            overbracket.append(t)
-        if len(overbracket) == 4:
-            break
-    overbracket = sort_teams(overbracket, standings, tiebreak)
-
-    underbracket = [division_teams[-1], nondivision_teams[-1]]
-    for t in subleague_teams[::-1]:
-        if t not in underbracket:
-            underbracket.append(t)
-        if len(underbracket) == 4:
-            break
-    underbracket = sort_teams(underbracket, standings, tiebreak)
-    middling = [
-        t for t in subleague_teams
-        if (t not in overbracket)
-        and (t not in underbracket)
-    ]
-
-    # TODO: Fix these for the case of division leader in last place
-    overbracket_cutoff = middling[0][0]
-    underbracket_cutoff = middling[-1][0]
+class Cutoffs(NamedTuple):
+    over: Team
+    under: Team
+    party: Team
 
-    party_cutoff = overbracket[-1][0]
-    if party_cutoff == nondivision_teams[0][0]:
-        # Beating this team does nothing, they get in regardless
-        party_cutoff = overbracket[-2][0]
 
-    over = estimate(team, overbracket_cutoff, standings, tiebreak)
-    under = estimate(underbracket_cutoff, team, standings, tiebreak)
-    party = estimate(party_cutoff, team, standings, tiebreak)
+def format_row(ateam: ATeam, cutoffs: Cutoffs, day: int, standings: Standings, ranks: Ranks) -> Row:
+    team, subleague, division = ateam
+    over = estimate(team, cutoffs.over, standings, ranks)
+    under = estimate(cutoffs.under, team, standings, ranks)
+    party = estimate(cutoffs.party, team, standings, ranks)
 
     games_played = standings.games_played[team.id]
     losses = standings.losses[team.id]
@@ -82,7 +56,7 @@ def format_row(ateam: ATeam, other_teams: list[ATeam], day: int, standings: Stan
         losses=losses,
         nonlosses=games_played - losses,
         badge="",
-        tiebreaker=tiebreak.order.index(team.id) + 1,
+        tiebreaker=ranks[team.id] + 1,
         over=over,
         under=under,
         party=party,
@@ -91,51 +65,170 @@ def format_row(ateam: ATeam, other_teams: list[ATeam], day: int, standings: Stan
     )
 
 
-def estimate(team: Team, to_beat: Team, standings: Standings, tiebreak: Tiebreakers) -> int:
+def rank_subleague(teams: list[ATeam]) -> dict[UUID, Cutoffs]:
+    """Work out the cutoffs for each division from a subleague's teams in standings order"""
+    divisions = dict.fromkeys(division.id for _, _, division in teams)
+    cutoffs = {}
+    for division_id in divisions:
+        ours = [i for i, t in enumerate(teams) if t[2].id == division_id]
+        theirs = [i for i, t in enumerate(teams) if t[2].id != division_id]
+
+        overbracket = fill([ours[0], theirs[0]], range(len(teams)))
+        underbracket = fill([ours[-1], theirs[-1]], range(len(teams) - 1, -1, -1))
+        taken = set(overbracket) | set(underbracket)
+        middling = [i for i in range(len(teams)) if i not in taken]
+
+        # TODO: Fix these for the case of division leader in last place
+        party_cutoff = overbracket[-1]
+        if party_cutoff == theirs[0]:
+            # Beating this team does nothing, they get in regardless
+            party_cutoff = overbracket[-2]
+
+        cutoffs[division_id] = Cutoffs(
+            over=teams[middling[0]][0],
+            under=teams[middling[-1]][0],
+            party=teams[party_cutoff][0],
+        )
+    return cutoffs
+
+
+def fill(bracket: list[int], candidates: Iterable[int]) -> list[int]:
+    """Top up bracket to four teams from candidates, in standings order"""
+    for i in candidates:
+        if len(bracket) == 4:
+            break
+        if i not in bracket:
+            bracket.append(i)
+    return sorted(bracket)
+
+
+def estimate(team: Team, to_beat: Team, standings: Standings, ranks: Ranks) -> int:
     difference = standings.wins[team.id] - standings.wins[to_beat.id]
-    if tiebreak.order.index(to_beat.id) > tiebreak.order.index(team.id):
+    if ranks[to_beat.id] > ranks[team.id]:
         difference += 1
 
     played = standings.games_played[team.id]
     if played == 0:
         # We literally have nothing to go on
         return -1
+    if difference + played <= 0:
+        # Not gaining at all at this pace
+        return 100
     return int((99 * played) / (difference + played)) + 1
 
 
 def league_teams(league: LeagueData) -> list[ATeam]:
+    index = league.index
     return [
-        (t, s, d)
-        for s in league.subleagues
-        for d in league.divisions if d.id in s.divisions
-        for t in league.teams if t.id in d.teams
+        (t, index.team_subleague[t.id], index.team_division[t.id])
+        for t in league.teams if t.id in index.team_subleague
     ]
 
 
-def sort_teams(teams: list[ATeam], standings: Standings, tiebreak: Tiebreakers) -> list[ATeam]:
+def sort_teams(teams: list[ATeam], standings: Standings, ranks: Ranks) -> list[ATeam]:
     return sorted(
         teams,
         key=lambda t: (
             standings.wins[t[0].id],
-            -tiebreak.order.index(t[0].id),
+            -ranks[t[0].id],
         ),
         reverse=True,
     )
 
 
+def league_ranks(league_data: LeagueData) -> Ranks:
+    league = league_data.leagues[0]
+    tiebreaker = league_data.index.tiebreakers[league.tiebreakers]
+    return {team_id: rank for rank, team_id in enumerate(tiebreaker.order)}
+
+
+def group_teams(teams: list[ATeam]) -> dict[UUID, list[ATeam]]:
+    subleagues: dict[UUID, list[ATeam]] = defaultdict(list)
+    for ateam in teams:
+        subleagues[ateam[1].id].append(ateam)
+    return subleagues
+
+
+def subleague_rows(teams: list[ATeam], day: int, standings: Standings, ranks: Ranks) -> list[Row]:
+    """Rows for the teams of one subleague, which must already be in standings order"""
+    cutoffs = rank_subleague(teams)
+    return [
+        format_row(ateam, cutoffs[ateam[2].id], day, standings, ranks)
+        for ateam in teams
+    ]
+
+
 def get_standings(game_data: GamesData, league_data: LeagueData) -> Prediction:
     """Get Blaseball data and return party time predictions"""
 
-    league = league_data.leagues[0]
-    tiebreaker = next((
-        tb for tb in league_data.tiebreakers
-        if tb.id == league.tiebreakers
-    ))
-    predictions: Prediction = defaultdict(list)
-    teams = league_teams(league_data)
-    teams = sort_teams(teams, game_data.standings, tiebreaker)
-    for ateam in teams:
-        subleague = ateam[1]
-        predictions[subleague.name].append(format_row(ateam, teams, game_data.sim.day, game_data.standings, tiebreaker))
+    ranks = league_ranks(league_data)
+    teams = sort_teams(league_teams(league_data), game_data.standings, ranks)
+
+    predictions: Prediction = {}
+    for subleague_teams in group_teams(teams).values():
+        subleague = subleague_teams[0][1]
+        predictions[subleague.name] = subleague_rows(subleague_teams, game_data.sim.day, game_data.standings, ranks)
 
     return predictions
+
+
+def league_fingerprint(league_data: LeagueData) -> Hashable:
+    """Everything about the league that goes into the standings, to tell when it changed"""
+    return (
+        tuple(league_ranks(league_data).items()),
+        tuple(
+            (
+                team.id, team.nickname, team.main_color.as_hex(), team.championships, team.underchampionships,
+                subleague.id, subleague.name, division.id, division.name,
+            )
+            for team, subleague, division in league_teams(league_data)
+        ),
+    )
+
+
+class Tracker:
+    """Keep predictions between updates and only redo the subleagues whose records moved"""
+
+    def __init__(self) -> None:
+        self.predictions: Prediction = {}
+        self._league_data: Optional[LeagueData] = None
+        self._fingerprint: Hashable = None
+        self._ranks: Ranks = {}
+        self._subleagues: dict[UUID, list[ATeam]] = {}
+        self._records: dict[UUID, Hashable] = {}
+
+    def update(self, game_data: GamesData, league_data: LeagueData) -> set[str]:
+        """Bring predictions up to date and return the names of the subleagues that changed"""
+        if league_data is not self._league_data:
+            self._league_data = league_data
+            fingerprint = league_fingerprint(league_data)
+            if fingerprint != self._fingerprint:
+                # Teams moved or got renamed, start over
+                self._fingerprint = fingerprint
+                self._ranks = league_ranks(league_data)
+                self._subleagues = group_teams(league_teams(league_data))
+                self._records = {}
+                self.predictions = {}
+
+        standings = game_data.standings
+        day = game_data.sim.day
+        changed = set()
+        for subleague_id, teams in self._subleagues.items():
+            record = (day, tuple(
+                (
+                    standings.wins.get(team.id),
+                    standings.losses.get(team.id),
+                    standings.games_played.get(team.id),
+                )
+                for team, _, _ in teams
+            ))
+            if self._records.get(subleague_id) == record:
+                continue
+
+            self._records[subleague_id] = record
+            subleague = teams[0][1]
+            self.predictions[subleague.name] = subleague_rows(
+                sort_teams(teams, standings, self._ranks), day, standings, self._ranks,
+            )
+            changed.add(subleague.name)
+        return changed
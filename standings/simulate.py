@@ -0,0 +1,126 @@
+"""Monte Carlo odds of each team's postseason fate
+
+Rather than extrapolating from the current pace, play out the rest of the
+season many times over. Games already on the schedule are won with their
+posted odds, and every other remaining game is won at the rate the team
+is favored in the games we know of (evens if there are none). Each run is
+then seeded the same way the standings are: both division winners and the
+next two best teams of each subleague make the overbracket, both division
+losers and the next two worst make the underbracket, and ties go to the
+league tiebreaker order.
+"""
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from models.game import GamesData
+from models.league import LeagueData
+
+SEASON_LENGTH = 99
+BRACKET_SIZE = 4
+SIMULATIONS = 20_000
+
+
+class Odds(NamedTuple):
+    playoffs: float
+    overbracket: float
+    underbracket: float
+    party: float
+
+
+def _pick(keys: np.ndarray, members: np.ndarray, best: bool) -> np.ndarray:
+    """Column of the best (or worst) team among members for every run"""
+    chosen = keys[:, members].argmax(axis=1) if best else keys[:, members].argmin(axis=1)
+    return members[chosen]
+
+
+def simulate(
+    game_data: GamesData,
+    league_data: LeagueData,
+    simulations: int = SIMULATIONS,
+    seed: Optional[int] = None,
+) -> dict[str, Odds]:
+    """Return the odds of every team in a division, keyed by team id"""
+    standings = game_data.standings
+    index = league_data.index
+    tiebreak = index.tiebreakers[league_data.leagues[0].tiebreakers]
+    teams = list(index.team_division)
+    if not teams:
+        return {}
+    column = {team_id: i for i, team_id in enumerate(teams)}
+    rng = np.random.default_rng(seed)
+
+    wins = np.array([standings.wins.get(team_id, 0) for team_id in teams])
+    played = np.array([standings.games_played.get(team_id, 0) for team_id in teams])
+    remaining = np.clip(SEASON_LENGTH - played, 0, None)
+
+    # Games we know the matchup and odds for
+    games = [
+        game for game in game_data.schedule + game_data.tomorrow_schedule
+        if not game.game_complete and game.home_team in column and game.away_team in column
+    ]
+    home = np.array([column[game.home_team] for game in games], dtype=int)
+    away = np.array([column[game.away_team] for game in games], dtype=int)
+    home_odds = np.array([game.home_odds for game in games], dtype=float)
+    away_odds = np.array([game.away_odds for game in games], dtype=float)
+
+    known = np.bincount(home, minlength=len(teams)) + np.bincount(away, minlength=len(teams))
+    favored = np.bincount(home, weights=home_odds, minlength=len(teams))
+    favored += np.bincount(away, weights=away_odds, minlength=len(teams))
+    rate = np.divide(favored, known, out=np.full(len(teams), 0.5), where=known > 0)
+    unknown = np.clip(remaining - known, 0, None)
+
+    final = wins + rng.binomial(unknown, rate, size=(simulations, len(teams)))
+    if games:
+        home_wins = rng.random((simulations, len(games))) < home_odds / (home_odds + away_odds)
+        np.add.at(final.T, home, home_wins.T)
+        np.add.at(final.T, away, ~home_wins.T)
+
+    # Sort key folding the tiebreaker in below a single win
+    order = {team_id: rank for rank, team_id in enumerate(tiebreak.order)}
+    ranks = np.array([order.get(team_id, len(order)) for team_id in teams])
+    keys = final * (len(order) + 1) - ranks
+
+    rows = np.arange(simulations)
+    over = np.zeros_like(final, dtype=bool)
+    under = np.zeros_like(final, dtype=bool)
+    for subleague in index.subleagues.values():
+        divisions = [
+            np.array([
+                column[team_id] for team_id in index.divisions[division_id].teams
+                if team_id in column
+            ], dtype=int)
+            for division_id in subleague.divisions
+            if division_id in index.divisions
+        ]
+        divisions = [division for division in divisions if len(division)]
+        if not divisions:
+            continue
+        members = np.concatenate(divisions)
+        for division in divisions:
+            over[rows, _pick(keys, division, best=True)] = True
+            under[rows, _pick(keys, division, best=False)] = True
+
+        # Fill the rest of each bracket from whoever is left
+        spots = min(BRACKET_SIZE, len(members) // 2) - len(divisions)
+        if spots <= 0:
+            continue
+        taken = over[:, members] | under[:, members]
+        best_first = np.argsort(np.where(taken, np.iinfo(keys.dtype).max, -keys[:, members]), axis=1)
+        over[rows[:, None], members[best_first[:, :spots]]] = True
+
+        taken = over[:, members] | under[:, members]
+        worst_first = np.argsort(np.where(taken, np.iinfo(keys.dtype).max, keys[:, members]), axis=1)
+        under[rows[:, None], members[worst_first[:, :spots]]] = True
+
+    over_odds = over.mean(axis=0)
+    under_odds = under.mean(axis=0)
+    return {
+        str(team_id): Odds(
+            playoffs=float(over_odds[i] + under_odds[i]),
+            overbracket=float(over_odds[i]),
+            underbracket=float(under_odds[i]),
+            party=float(1 - over_odds[i]),
+        )
+        for i, team_id in enumerate(teams)
+    }
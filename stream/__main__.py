@@ -0,0 +1,18 @@
+import argparse
+import asyncio
+from pathlib import Path
+
+from stream import hub, source
+
+
+async def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Share one Blaseball stream with local subscribers")
+    arg_parser.add_argument("--socket", type=Path, default=hub.SOCKET)
+    source.add_arguments(arg_parser, subscribe=False)
+    args = arg_parser.parse_args()
+
+    await hub.Hub().run(source.open_stream(args), args.socket)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
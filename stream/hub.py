@@ -0,0 +1,133 @@
+"""One upstream connection shared by any number of local consumers
+
+The hub reads the stream once, validates each event once, and passes on
+just the sections that changed to everyone subscribed over a Unix socket,
+one JSON line per event. A new subscriber gets every section to start
+with. One that falls behind skips straight to the newest sections rather
+than working through each event in order.
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import AsyncIterator, Union
+
+from pydantic import ValidationError
+
+from models import JSON
+from models.live import StreamParser
+
+SOCKET = Path("/tmp/blaseball-stream.sock")
+# Whole events come down one line
+LINE_LIMIT = 64 * 1024 * 1024
+
+
+def _line(sections: dict[str, str]) -> bytes:
+    """A message of sections that are already JSON"""
+    data = ", ".join(f"{json.dumps(name)}: {text}" for name, text in sections.items())
+    return f'{{"data": {{{data}}}}}\n'.encode()
+
+
+class Subscriber:
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self.writer = writer
+        self._pending: dict[str, str] = {}
+        self._ready = asyncio.Event()
+        self._closing = False
+        self.done = asyncio.Event()
+
+    def send(self, sections: dict[str, str]) -> None:
+        # Anything not written yet is out of date now anyway
+        self._pending.update(sections)
+        self._ready.set()
+
+    def close(self) -> None:
+        """Hang up once everything pending is written"""
+        self._closing = True
+        self._ready.set()
+
+    async def run(self) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                if self._pending:
+                    pending, self._pending = self._pending, {}
+                    self.writer.write(_line(pending))
+                    await self.writer.drain()
+                if self._closing:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.writer.close()
+            self.done.set()
+
+
+class Hub:
+    def __init__(self) -> None:
+        self.parser = StreamParser()
+        self.sections: dict[str, str] = {}
+        self.subscribers: set[Subscriber] = set()
+
+    def publish(self, event: JSON) -> None:
+        """Validate what changed in event and send it on"""
+        texts = {name: json.dumps(value) for name, value in event.items() if value is not None}
+        changed = {name: text for name, text in texts.items() if self.sections.get(name) != text}
+        if not changed:
+            return
+
+        loaded = {name: json.loads(text) for name, text in changed.items()}
+        try:
+            self.parser.parse({**self.parser.raw, **loaded}, copy=False)
+        except (ValidationError, KeyError, TypeError) as error:
+            # Subscribers trust what they're sent, so a bad event goes no further,
+            # but one is no reason to stop serving the rest
+            print(f"Dropped an event that doesn't parse: {error}", file=sys.stderr)
+            return
+        self.sections.update(changed)
+        for subscriber in self.subscribers:
+            subscriber.send(changed)
+
+    async def _connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        subscriber = Subscriber(writer)
+        if self.sections:
+            subscriber.send(self.sections)
+        self.subscribers.add(subscriber)
+        try:
+            await subscriber.run()
+        finally:
+            self.subscribers.discard(subscriber)
+
+    async def run(self, events: AsyncIterator[JSON], path: Union[str, Path] = SOCKET) -> None:
+        server = await asyncio.start_unix_server(self._connect, path=str(path), limit=LINE_LIMIT)
+        try:
+            async for event in events:
+                self.publish(event)
+        finally:
+            server.close()
+            subscribers = list(self.subscribers)
+            for subscriber in subscribers:
+                subscriber.close()
+            await asyncio.gather(*(subscriber.done.wait() for subscriber in subscribers))
+            await server.wait_closed()
+            Path(path).unlink(missing_ok=True)
+
+
+async def subscribe(path: Union[str, Path] = SOCKET) -> AsyncIterator[JSON]:
+    """Events from a hub, in place of stream_events
+
+    Everything has been validated by the hub already, so the events can be
+    parsed with StreamParser(trusted=True).
+    """
+    reader, writer = await asyncio.open_unix_connection(str(path), limit=LINE_LIMIT)
+    event: JSON = {}
+    try:
+        while line := await reader.readline():
+            if not line.endswith(b"\n"):
+                # Cut off by the hub going away
+                break
+            event = {**event, **json.loads(line)["data"]}
+            yield event
+    finally:
+        writer.close()
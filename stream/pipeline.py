@@ -0,0 +1,179 @@
+"""Run a stream consumer as stages, each handing its newest result to the next
+
+A Pipeline reads events from an async iterator on the event loop and passes
+them through a chain of stages, such as parse, compute and draw. Every stage
+runs on its own worker thread and takes its input from a small queue that
+drops the oldest item when full, so a slow stage only ever works on the
+latest data and never holds up the ones before it. In particular the
+stream itself keeps getting read however far behind drawing is. A stage
+whose items each only carry part of the picture, like a redraw of what
+changed, can merge a dropped item into the one that replaces it.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import (Any, AsyncIterator, Callable, Generic, NamedTuple,
+                    Optional, TypeVar)
+
+Item = TypeVar("Item")
+Merge = Callable[[Any, Any], Any]
+
+
+class Queued(NamedTuple):
+    value: Any
+    # When the event this came from was read, and when it was queued here
+    arrived: float
+    queued: float
+
+
+class Latest(Generic[Item]):
+    """A bounded queue that drops its oldest item rather than wait for room
+
+    With merge, the dropped item and the new one are merged into one instead.
+    """
+
+    def __init__(self, maxsize: int = 1, merge: Optional[Callable[[Item, Item], Item]] = None) -> None:
+        self._items: deque[Item] = deque(maxlen=maxsize)
+        self._ready = asyncio.Event()
+        self.merge = merge
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, item: Item) -> None:
+        if len(self._items) == self._items.maxlen:
+            self.dropped += 1
+            if self.merge is not None:
+                item = self.merge(self._items.popleft(), item)
+        self._items.append(item)
+        self._ready.set()
+
+    async def get(self) -> Item:
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._items.popleft()
+
+
+class Stats(NamedTuple):
+    name: str
+    done: int
+    dropped: int
+    depth: int
+    # Average seconds spent queued and working, and since the event was read
+    wait: float
+    run: float
+    latency: float
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name} {self.depth}q {self.dropped}✗"
+            f" {self.wait * 1000:.1f}+{self.run * 1000:.1f}ms ({self.latency * 1000:.0f}ms)"
+        )
+
+
+class Stage:
+    """A function from one stage's results to the next, run off the event loop
+
+    Returning None passes nothing on. With fps, the stage runs at most that
+    many times a second, which is what a drawing stage wants. merge(dropped,
+    newer) combines an input dropped for want of room with the newer one.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        maxsize: int = 1,
+        fps: Optional[float] = None,
+        merge: Optional[Merge] = None,
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.queue: Latest[Queued] = Latest(maxsize, _merge_queued(merge) if merge else None)
+        self.interval = 1 / fps if fps else 0
+        self.done = 0
+        self.busy = False
+        self._wait = self._run = self._latency = 0.0
+
+    @property
+    def stats(self) -> Stats:
+        done = self.done or 1
+        return Stats(
+            name=self.name,
+            done=self.done,
+            dropped=self.queue.dropped,
+            depth=len(self.queue),
+            wait=self._wait / done,
+            run=self._run / done,
+            latency=self._latency / done,
+        )
+
+    async def run(self, next_stage: Optional["Stage"]) -> None:
+        while True:
+            item = await self.queue.get()
+            self.busy = True
+            started = time.monotonic()
+            try:
+                result = await asyncio.to_thread(self.func, item.value)
+            finally:
+                self.busy = False
+            finished = time.monotonic()
+
+            self.done += 1
+            self._wait += started - item.queued
+            self._run += finished - started
+            self._latency += finished - item.arrived
+            if result is not None and next_stage is not None:
+                next_stage.queue.put(Queued(result, item.arrived, finished))
+            if self.interval:
+                await asyncio.sleep(self.interval - (finished - started))
+
+
+def _merge_queued(merge: Merge) -> Callable[[Queued, Queued], Queued]:
+    return lambda dropped, newer: newer._replace(value=merge(dropped.value, newer.value))
+
+
+class Pipeline:
+    def __init__(self, *stages: Stage) -> None:
+        self.stages = stages
+
+    def stats(self) -> list[Stats]:
+        return [stage.stats for stage in self.stages]
+
+    def report(self) -> str:
+        return " → ".join(str(stats) for stats in self.stats())
+
+    async def run(self, events: AsyncIterator[Any], read: Callable[[Any], Any] = lambda event: event) -> None:
+        """Feed events through the stages until they run out, or a stage fails
+
+        read runs on the event loop for every event, to take whatever the
+        first stage needs before the next event comes in.
+        """
+        first = self.stages[0]
+        workers = [
+            asyncio.create_task(stage.run(next_stage))
+            for stage, next_stage in zip(self.stages, self.stages[1:] + (None,))
+        ]
+        try:
+            async for event in events:
+                arrived = time.monotonic()
+                first.queue.put(Queued(read(event), arrived, arrived))
+                self._check(workers)
+            # Let what was read last make it all the way through
+            for stage in self.stages:
+                while len(stage.queue) or stage.busy:
+                    self._check(workers)
+                    await asyncio.sleep(0.01)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    @staticmethod
+    def _check(workers: list[asyncio.Task]) -> None:
+        for worker in workers:
+            if worker.done():
+                # Let the failure out
+                worker.result()
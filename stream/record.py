@@ -0,0 +1,97 @@
+"""Record stream events to disk and play them back later
+
+A recording is a gzip file of JSON lines, one per event, holding the time
+the event arrived and its payload. Events are written out in chunks, each
+compressed on its own and appended to the end of the file as a separate
+gzip member. Nothing already written is ever touched again, a crash only
+loses the chunk in progress, and gzip readers see the whole file as a
+single stream.
+"""
+import asyncio
+import gzip
+import json
+import time
+from pathlib import Path
+from types import TracebackType
+from typing import AsyncIterator, Iterator, Optional, Union
+
+from models import JSON
+
+CHUNK_EVENTS = 100
+CHUNK_SECONDS = 60
+
+
+class Recorder:
+    def __init__(self, path: Union[str, Path], chunk_events: int = CHUNK_EVENTS, chunk_seconds: float = CHUNK_SECONDS) -> None:
+        self.path = Path(path)
+        self.chunk_events = chunk_events
+        self.chunk_seconds = chunk_seconds
+        self._lines: list[str] = []
+        self._started = time.monotonic()
+
+    def write(self, event: JSON, arrived: Optional[float] = None) -> None:
+        # Serialized right away, the stream client changes event in place later
+        self.write_text(json.dumps(event), arrived)
+
+    def write_text(self, text: str, arrived: Optional[float] = None) -> None:
+        """Record an event that is already JSON"""
+        if arrived is None:
+            arrived = time.time()
+        if not self._lines:
+            self._started = time.monotonic()
+        self._lines.append(f'{{"t": {arrived!r}, "data": {text}}}\n')
+        if len(self._lines) >= self.chunk_events or time.monotonic() - self._started >= self.chunk_seconds:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._lines:
+            return
+        chunk = gzip.compress("".join(self._lines).encode())
+        with self.path.open("ab") as recording:
+            recording.write(chunk)
+        self._lines = []
+
+    def __enter__(self) -> "Recorder":
+        return self
+
+    def __exit__(self, exc_type: Optional[type[BaseException]], exc: Optional[BaseException], traceback: Optional[TracebackType]) -> None:
+        self.flush()
+
+
+async def record(events: AsyncIterator[JSON], path: Union[str, Path]) -> AsyncIterator[JSON]:
+    """Pass events through, recording each of them to path on the way"""
+    with Recorder(path) as recorder:
+        async for event in events:
+            recorder.write(event)
+            yield event
+
+
+def read(path: Union[str, Path]) -> Iterator[tuple[float, JSON]]:
+    """Every complete event in a recording with the time it arrived"""
+    with gzip.open(path, "rt") as recording:
+        try:
+            for line in recording:
+                entry = json.loads(line)
+                yield entry["t"], entry["data"]
+        except (EOFError, gzip.BadGzipFile, json.JSONDecodeError):
+            # The recorder was cut off mid chunk
+            return
+
+
+async def replay(path: Union[str, Path], speed: Optional[float] = 1) -> AsyncIterator[JSON]:
+    """Play a recording back in place of stream_events
+
+    Events come at their recorded pace sped up by speed, or as fast as they
+    can be taken with a speed of None.
+    """
+    start: Optional[tuple[float, float]] = None
+    for arrived, event in read(path):
+        if start is None:
+            start = (arrived, time.monotonic())
+        if speed:
+            due = start[1] + (arrived - start[0]) / speed
+            await asyncio.sleep(due - time.monotonic())
+        else:
+            # Still let everything else waiting on the loop have a go
+            await asyncio.sleep(0)
+        yield event
@@ -0,0 +1,55 @@
+"""Keep the latest stream data on disk to start from next time
+
+Rather than show nothing until the stream sends a full event, a consumer
+can play back the sections it last parsed, saved every so often while it
+runs, and have something to draw straight away. The live events that
+follow replace the saved ones as they come in.
+"""
+import gzip
+import json
+import os
+import time
+from pathlib import Path
+from typing import AsyncIterator, Optional, Union
+
+from models import JSON
+
+SAVE_SECONDS = 30
+
+
+class Snapshot:
+    def __init__(self, path: Union[str, Path], interval: float = SAVE_SECONDS) -> None:
+        self.path = Path(path)
+        self.interval = interval
+        self._saved = time.monotonic()
+
+    def load(self) -> Optional[JSON]:
+        try:
+            with gzip.open(self.path, "rt") as snapshot_file:
+                return json.load(snapshot_file)
+        except (OSError, EOFError, json.JSONDecodeError):
+            # Not saved yet, or cut off while saving
+            return None
+
+    def save(self, sections: JSON) -> None:
+        if not sections:
+            # Nothing came in, so keep what was there
+            return
+        temp_path = self.path.with_suffix(".tmp")
+        with gzip.open(temp_path, "wt") as snapshot_file:
+            json.dump(sections, snapshot_file)
+        os.replace(temp_path, self.path)
+        self._saved = time.monotonic()
+
+    def update(self, sections: JSON) -> None:
+        """Save sections if the last save is old enough"""
+        if time.monotonic() - self._saved >= self.interval:
+            self.save(sections)
+
+    async def events(self, events: AsyncIterator[JSON]) -> AsyncIterator[JSON]:
+        """The saved sections as an event, followed by events"""
+        saved = self.load()
+        if saved:
+            yield saved
+        async for event in events:
+            yield event
@@ -0,0 +1,61 @@
+"""Where a stream consumer gets its events from, picked on the command line
+
+Each source has one layer of reconnecting with backoff. stream_events
+already reconnects to the upstream stream on its own, so it's only told
+how long to wait. The hub socket has nothing of the sort, so reconnect
+does it for subscribers.
+"""
+import argparse
+import asyncio
+from functools import partial
+from pathlib import Path
+from typing import AsyncIterator, Callable
+
+from blaseball_mike.events import stream_events
+
+from models import JSON
+from stream import hub
+from stream.record import record, replay
+
+# Seconds to wait before reconnecting, doubled after every failed attempt
+BACKOFF = 1
+BACKOFF_MAX = 60
+
+
+def add_arguments(parser: argparse.ArgumentParser, subscribe: bool = True) -> None:
+    if subscribe:
+        parser.add_argument("--hub", type=Path, nargs="?", const=hub.SOCKET, help="Get events from a local hub instead of connecting")
+    parser.add_argument("--record", type=Path, help="Append every event to this recording")
+    parser.add_argument("--replay", type=Path, help="Play this recording back instead of connecting")
+    parser.add_argument("--speed", type=float, default=1, help="How much faster to replay, 0 for as fast as possible")
+
+
+async def reconnect(connect: Callable[[], AsyncIterator[JSON]]) -> AsyncIterator[JSON]:
+    """Events from connect, connecting again whenever they stop
+
+    Consumers keep showing what they last had in the meantime. Besides
+    connection errors, that covers a line that's too long or doesn't parse.
+    """
+    delay = BACKOFF
+    while True:
+        try:
+            async for event in connect():
+                delay = BACKOFF
+                yield event
+        except (OSError, ValueError, asyncio.IncompleteReadError):
+            pass
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, BACKOFF_MAX)
+
+
+def open_stream(args: argparse.Namespace) -> AsyncIterator[JSON]:
+    """The events the arguments from add_arguments ask for"""
+    if getattr(args, "hub", None):
+        events = reconnect(partial(hub.subscribe, args.hub))
+    elif args.replay:
+        events = replay(args.replay, args.speed or None)
+    else:
+        events = stream_events(retry_base=BACKOFF, retry_max=BACKOFF_MAX)
+    if args.record:
+        events = record(events, args.record)
+    return events
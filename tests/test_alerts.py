@@ -0,0 +1,79 @@
+import copy
+import random
+
+import pytest
+
+from alerts.rules import Engine, Rule
+from bench.fixtures import fake_model
+from models import JSON
+from models.game import Game
+
+
+def raw_game(seed: int, away: str, home: str) -> JSON:
+    raw = fake_model(Game, random.Random(seed))
+    raw.update(
+        awayTeamName=f"The {away}", awayTeamNickname=away, awayScore=0,
+        homeTeamName=f"The {home}", homeTeamNickname=home, homeScore=0,
+        shame=False, gameComplete=False, lastUpdate="", secretBaserunner=None,
+    )
+    return raw
+
+
+def play(raw: JSON, **changes: object) -> Game:
+    raw = copy.deepcopy(raw)
+    raw.update(changes)
+    return Game.parse_obj(raw)
+
+
+@pytest.fixture
+def raws() -> list[JSON]:
+    return [raw_game(0, "Tigers", "Lovers"), raw_game(1, "Crabs", "Moist Talkers")]
+
+
+def test_new_games_are_only_remembered(raws: list[JSON]) -> None:
+    engine = Engine([Rule("scores"), Rule("final")])
+    assert engine.check([play(raws[0], homeScore=1, gameComplete=True)], 0) == []
+
+
+def test_unchanged_games_are_skipped(raws: list[JSON]) -> None:
+    engine = Engine([Rule("scores")])
+    games = [Game.parse_obj(raw) for raw in raws]
+    engine.check(games, 0)
+    # The parser hands back the very same objects when nothing changed, so
+    # those aren't even looked at
+    games[0].home_score = 1
+    assert engine.check(games, 1) == []
+
+
+def test_rules_for_the_teams_playing(raws: list[JSON]) -> None:
+    tigers, lovers = Rule("scores", "tigers"), Rule("scores", "The Lovers")
+    everyone, crabs = Rule("scores"), Rule("scores", "crabs")
+    engine = Engine([tigers, lovers, everyone, crabs])
+    engine.check([Game.parse_obj(raw) for raw in raws], 0)
+
+    games = [play(raws[0], homeScore=1), Game.parse_obj(raws[1])]
+    alerts = engine.check(games, 1)
+    assert {alert.rule for alert in alerts} == {lovers, everyone}
+    assert all(alert.game == games[0].id and alert.arrived == 1 for alert in alerts)
+    assert "The Lovers score!" in alerts[0].message
+
+    # Scoring again only alerts for the new run
+    assert engine.check([play(raws[0], homeScore=1), games[1]], 2) == []
+
+
+def test_rules_for_either_team(raws: list[JSON]) -> None:
+    shame = Rule("shame", str(raws[1]["awayTeam"]))
+    engine = Engine([shame, Rule("final", "tigers")])
+    engine.check([Game.parse_obj(raw) for raw in raws], 0)
+
+    games = [Game.parse_obj(raws[0]), play(raws[1], shame=True, gameComplete=True)]
+    alerts = engine.check(games, 1)
+    assert [alert.rule for alert in alerts] == [shame]
+    assert alerts[0].message == "Crabs @ Moist Talkers: SHAME"
+
+
+def test_rules_parse() -> None:
+    assert Rule.parse("final:Crabs") == Rule("final", "Crabs")
+    assert Rule.parse("shame") == Rule("shame")
+    with pytest.raises(ValueError):
+        Rule.parse("nope")
@@ -0,0 +1,92 @@
+import itertools
+import random
+
+import pytest
+
+from standings import elimination
+from standings.elimination import Subleague
+
+SEASON_LENGTH = 8
+
+
+def bracket(final: list[int], ranks: tuple[int, ...], divisions: tuple[int, ...]) -> set[int]:
+    """The overbracket for these final standings: division winners and the next two best"""
+    def key(team: int) -> tuple[int, int]:
+        return final[team], -ranks[team]
+
+    teams = range(len(final))
+    winners = {
+        max((team for team in teams if divisions[team] == division), key=key)
+        for division in set(divisions)
+    }
+    rest = sorted((team for team in teams if team not in winners), key=key, reverse=True)
+    return winners | set(rest[:2])
+
+
+def brute_force(state: Subleague, team: int) -> tuple[bool, bool]:
+    """Whether team makes the bracket in any way of finishing the season, and misses it in any"""
+    free = [
+        remaining - sum(rival in game for game in state.games)
+        for rival, remaining in enumerate(state.remaining)
+    ]
+    outcomes = set()
+    for winners in itertools.product((0, 1), repeat=len(state.games)):
+        wins = list(state.wins)
+        for game, winner in zip(state.games, winners):
+            wins[game[winner]] += 1
+        for extra in itertools.product(*(range(games + 1) for games in free)):
+            final = [won + more for won, more in zip(wins, extra)]
+            outcomes.add(team in bracket(final, state.ranks, state.divisions))
+            if len(outcomes) == 2:
+                return True, True
+    return True in outcomes, False in outcomes
+
+
+def small_subleague(rng: random.Random) -> Subleague:
+    teams = 8
+    remaining = [rng.randrange(3) for _ in range(teams)]
+    left = list(remaining)
+    games = []
+    for _ in range(rng.randrange(4)):
+        away, home = rng.sample(range(teams), 2)
+        if left[away] and left[home]:
+            left[away] -= 1
+            left[home] -= 1
+            games.append((away, home))
+    return Subleague(
+        wins=tuple(rng.randrange(SEASON_LENGTH - remaining[team] + 1) for team in range(teams)),
+        remaining=tuple(remaining),
+        ranks=tuple(rng.sample(range(teams), teams)),
+        divisions=(0,) * 4 + (1,) * 4,
+        games=tuple(games),
+    )
+
+
+@pytest.fixture(autouse=True)
+def short_season(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(elimination, "SEASON_LENGTH", SEASON_LENGTH)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matches_brute_force(seed: int) -> None:
+    subleague = small_subleague(random.Random(seed))
+    for state in (subleague, subleague.mirrored()):
+        for team in range(len(state.wins)):
+            can_make, can_miss = brute_force(state, team)
+            assert state.can_make(team, state.wins[team] + state.remaining[team]) == can_make
+            assert state.can_miss(team, state.wins[team]) == can_miss
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_magic_numbers(seed: int) -> None:
+    state = small_subleague(random.Random(seed))
+    for team in range(len(state.wins)):
+        magic = state.solve(team)
+        wins, remaining = state.wins[team], state.remaining[team]
+        if magic.clinch is not None:
+            # Winning that many is enough, one fewer isn't
+            assert not state.can_miss(team, wins + magic.clinch)
+            assert state.can_miss(team, wins + magic.clinch - 1)
+        if magic.elimination is not None:
+            assert not state.can_make(team, wins + remaining - magic.elimination)
+            assert state.can_make(team, wins + remaining - magic.elimination + 1)
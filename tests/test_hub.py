@@ -0,0 +1,67 @@
+import asyncio
+import copy
+import json
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+from bench.fixtures import stream_event
+from models import JSON
+from stream import source
+from stream.hub import Hub, subscribe
+
+
+def test_bad_events_are_dropped(capsys: pytest.CaptureFixture[str]) -> None:
+    hub = Hub()
+    event = stream_event(teams=8)
+    hub.publish(event)
+    sections = dict(hub.sections)
+
+    bad = copy.deepcopy(event)
+    bad["games"]["sim"]["day"] = "tomorrow"
+    hub.publish(bad)
+    assert hub.sections == sections
+    assert "Dropped" in capsys.readouterr().err
+
+    # The next good one goes through as usual
+    good = copy.deepcopy(event)
+    good["games"]["sim"]["day"] += 1
+    hub.publish(good)
+    assert json.loads(hub.sections["games"]) == good["games"]
+
+
+def serve(path: Path, *responses: bytes) -> "asyncio.Future[asyncio.AbstractServer]":
+    """A hub that sends each connection the next of responses and hangs up"""
+    replies = iter(responses)
+
+    async def reply(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.write(next(replies, b""))
+        await writer.drain()
+        writer.close()
+
+    return asyncio.ensure_future(asyncio.start_unix_server(reply, path=str(path)))
+
+
+def test_subscribers_reconnect(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(source, "BACKOFF", 0)
+    path = tmp_path / "hub.sock"
+    responses = [
+        # Cut off halfway through a line
+        b'{"data": {"games": 1}}\n{"data": {"gam',
+        # Garbage
+        b'{"data": nope}\n',
+        b'{"data": {"games": 2}}\n{"data": {"leagues": 3}}\n',
+    ]
+
+    async def main() -> list[JSON]:
+        server = await serve(path, *responses)
+        events = []
+        async for event in source.reconnect(partial(subscribe, path)):
+            events.append(event)
+            if len(events) == 3:
+                break
+        server.close()
+        return events
+
+    assert asyncio.run(main()) == [{"games": 1}, {"games": 2}, {"games": 2, "leagues": 3}]
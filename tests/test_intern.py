@@ -0,0 +1,51 @@
+import sys
+import threading
+import uuid
+
+from models.intern import Interner
+
+
+def test_equal_values_are_the_same_instance() -> None:
+    interner = Interner(uuid.UUID, size=4)
+    raw = str(uuid.UUID(int=1))
+    assert interner(raw) is interner(raw)
+    assert len(interner) == 1
+
+
+def test_least_recently_used_goes_first() -> None:
+    interner = Interner(int, size=2)
+    one = interner("1")
+    interner("2")
+    interner("1")
+    interner("3")
+    assert interner("1") is one
+    assert len(interner) == 2
+
+
+def test_threads_evicting_each_other() -> None:
+    # Small enough that every thread keeps evicting what the others just used
+    interner = Interner(uuid.UUID, size=8)
+    raws = [str(uuid.UUID(int=number)) for number in range(64)]
+    errors: list[BaseException] = []
+
+    def work(offset: int) -> None:
+        try:
+            for _ in range(200):
+                for raw in raws[offset:] + raws[:offset]:
+                    assert str(interner(raw)) == raw
+        except BaseException as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=work, args=(offset,)) for offset in range(0, 64, 8)]
+    # Switch threads as often as possible, to land between lookups
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert not errors
+    assert len(interner) <= 8
@@ -0,0 +1,63 @@
+import copy
+import random
+
+import pytest
+
+from bench.fixtures import stream_event
+from models import JSON, parse_changed
+from models.game import GamesData
+from models.live import StreamData, StreamParser
+
+
+def play(event: JSON, seed: int) -> JSON:
+    """The next event, with a few games moved along and a team's record changed"""
+    rng = random.Random(seed)
+    event = copy.deepcopy(event)
+    games = event["games"]
+    for game in rng.sample(games["schedule"], 3):
+        game["playCount"] += 1
+        game["lastUpdate"] = f"Play {game['playCount']}"
+    team_id = rng.choice(list(games["standings"]["wins"]))
+    games["standings"]["wins"][team_id] += 1
+    games["standings"]["gamesPlayed"][team_id] += 1
+    return event
+
+
+def events(count: int = 5) -> list[JSON]:
+    event = stream_event(teams=8)
+    played = [event]
+    for seed in range(count - 1):
+        played.append(play(played[-1], seed))
+    return played
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_stream_parser_matches_parse_obj(trusted: bool) -> None:
+    parser = StreamParser(trusted=trusted)
+    for event in events():
+        assert parser.parse(event) == StreamData.parse_obj(event)
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_parse_changed_matches_parse_obj(trusted: bool) -> None:
+    previous_raw = previous = None
+    for event in events():
+        raw = event["games"]
+        parsed = parse_changed(GamesData, raw, previous_raw, previous, trusted=trusted)
+        assert parsed == GamesData.parse_obj(raw)
+        previous_raw, previous = raw, parsed
+
+
+def test_parse_changed_reuses_unchanged_items() -> None:
+    first, second = (event["games"] for event in events(2))
+    previous = GamesData.parse_obj(first)
+    parsed = parse_changed(GamesData, second, first, previous)
+    assert parsed.sim is previous.sim
+    games = zip(parsed.schedule, previous.schedule, second["schedule"], first["schedule"])
+    for game, old_game, raw_game, old_raw_game in games:
+        assert (game is old_game) == (raw_game == old_raw_game)
+
+
+def test_parse_trusted_matches_parse_obj() -> None:
+    event = stream_event(teams=8)
+    assert StreamData.parse_trusted(event) == StreamData.parse_obj(event)
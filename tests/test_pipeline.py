@@ -0,0 +1,43 @@
+import asyncio
+import time
+from typing import AsyncIterator
+
+from stream.pipeline import Latest, Pipeline, Stage
+
+
+def test_latest_drops_the_oldest() -> None:
+    queue: Latest[int] = Latest(maxsize=1)
+    queue.put(1)
+    queue.put(2)
+    assert asyncio.run(queue.get()) == 2
+    assert queue.dropped == 1
+
+
+def test_latest_merges_what_it_drops() -> None:
+    queue: Latest[set[str]] = Latest(maxsize=1, merge=lambda dropped, newer: dropped | newer)
+    queue.put({"Evil"})
+    queue.put({"Good"})
+    assert asyncio.run(queue.get()) == {"Evil", "Good"}
+    assert queue.dropped == 1
+
+
+def test_slow_stage_sees_everything_merged() -> None:
+    drawn: list[set[str]] = []
+
+    def draw(changed: set[str]) -> None:
+        drawn.append(changed)
+        time.sleep(0.05)
+
+    async def events() -> AsyncIterator[set[str]]:
+        # A day ending, with games finishing in both subleagues back to back
+        for changed in ({"Good"}, {"Evil"}, {"Good"}):
+            yield changed
+            await asyncio.sleep(0.01)
+
+    pipeline = Pipeline(
+        Stage("compute", lambda changed: changed),
+        Stage("draw", draw, merge=lambda dropped, newer: dropped | newer),
+    )
+    asyncio.run(pipeline.run(events()))
+    assert set().union(*drawn) == {"Good", "Evil"}
+    assert drawn[-1] >= {"Evil"}
@@ -0,0 +1,61 @@
+from models import JSON
+from models.players import UNKNOWN_NAME, PlayerCache
+
+
+class Fetcher:
+    def __init__(self, missing: frozenset[str] = frozenset()) -> None:
+        self.missing = missing
+        self.calls: list[list[str]] = []
+
+    def __call__(self, player_ids: list[str]) -> dict[str, JSON]:
+        self.calls.append(player_ids)
+        return {
+            player_id: {"id": player_id, "name": player_id.title()}
+            for player_id in player_ids if player_id not in self.missing
+        }
+
+
+def test_missing_players_are_queued() -> None:
+    fetch = Fetcher()
+    # However long records are kept, one we don't have is still fetched
+    cache = PlayerCache(ttl=1e9, fetch=fetch)
+    assert cache.name("alice") == UNKNOWN_NAME
+    assert cache.name("bob") == UNKNOWN_NAME
+    cache.flush()
+    assert fetch.calls == [["alice", "bob"]]
+    assert cache.name("alice") == "Alice"
+
+
+def test_fresh_players_are_not_fetched_again() -> None:
+    fetch = Fetcher()
+    cache = PlayerCache(ttl=1e9, fetch=fetch)
+    assert cache.resolve(["alice"]) == {"alice": {"id": "alice", "name": "Alice"}}
+    cache.resolve(["alice", "bob"])
+    assert fetch.calls == [["alice"], ["bob"]]
+
+
+def test_stale_players_are_fetched_again() -> None:
+    fetch = Fetcher()
+    cache = PlayerCache(ttl=0, fetch=fetch)
+    cache.resolve(["alice"])
+    # The old record is used until the new one is in
+    assert cache.name("alice") == "Alice"
+    cache.flush()
+    assert fetch.calls == [["alice"], ["alice"]]
+
+
+def test_unknown_players_are_not_fetched_again() -> None:
+    fetch = Fetcher(missing=frozenset({"nobody"}))
+    cache = PlayerCache(ttl=1e9, fetch=fetch)
+    assert cache.resolve(["alice", "nobody"]) == {"alice": {"id": "alice", "name": "Alice"}}
+    assert cache.name("nobody") == UNKNOWN_NAME
+    cache.flush()
+    assert fetch.calls == [["alice", "nobody"]]
+
+
+def test_unknown_players_are_tried_again_once_stale() -> None:
+    fetch = Fetcher(missing=frozenset({"nobody"}))
+    cache = PlayerCache(ttl=0, fetch=fetch)
+    cache.resolve(["nobody"])
+    cache.resolve(["nobody"])
+    assert fetch.calls == [["nobody"], ["nobody"]]
@@ -0,0 +1,31 @@
+from bench.fixtures import stream_event
+from models.live import StreamData
+from standings.season import Tracker, get_standings
+
+
+def test_tracker_matches_get_standings() -> None:
+    event = stream_event()
+    data = StreamData.parse_obj(event)
+    assert data.games and data.leagues
+    tracker = Tracker()
+    assert tracker.update(data.games, data.leagues) == set(tracker.predictions)
+    assert tracker.predictions == get_standings(data.games, data.leagues)
+
+
+def test_tracker_only_starts_over_for_league_changes() -> None:
+    event = stream_event()
+    data = StreamData.parse_obj(event)
+    assert data.games and data.leagues
+    tracker = Tracker()
+    tracker.update(data.games, data.leagues)
+
+    # The same league parsed again changes nothing
+    leagues = StreamData.parse_obj(event).leagues
+    assert leagues
+    assert tracker.update(data.games, leagues) == set()
+
+    event["leagues"]["teams"][0]["nickname"] = "Renamed"
+    leagues = StreamData.parse_obj(event).leagues
+    assert leagues
+    assert tracker.update(data.games, leagues) == set(tracker.predictions)
+    assert tracker.predictions == get_standings(data.games, leagues)
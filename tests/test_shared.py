@@ -0,0 +1,109 @@
+import multiprocessing
+import threading
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from party import shared
+from party.publish import publish
+from party.shared import SharedPages
+
+# Processes forked after the pages are opened, like uWSGI workers
+fork = multiprocessing.get_context("fork")
+
+
+def elsewhere(pages: SharedPages, key: str, value: Optional[bytes] = None) -> Optional[bytes]:
+    """Set key to value in another process, or look it up there"""
+    results = fork.SimpleQueue()
+
+    def work() -> None:
+        if value is None:
+            results.put(pages.get(key))
+        else:
+            pages.set(key, value)
+            results.put(value)
+
+    process = fork.Process(target=work)
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+@pytest.fixture
+def pages(tmp_path: Path) -> SharedPages:
+    return SharedPages(tmp_path / "pages", size=4096)
+
+
+def test_pages_are_shared(pages: SharedPages) -> None:
+    pages.set("standings", b"<html>")
+    assert elsewhere(pages, "standings") == b"<html>"
+    elsewhere(pages, "teams", b"{}")
+    assert pages.get("teams") == b"{}"
+    assert pages.get("standings") == b"<html>"
+
+
+def test_clear_reaches_every_process(pages: SharedPages) -> None:
+    pages.set("standings", b"old")
+    # Indexed here, so this process has to notice the clear rather than rescan
+    assert pages.get("standings") == b"old"
+    assert elsewhere(pages, "standings") == b"old"
+
+    # The writers clear from a process of their own, opening the file afresh
+    shared.clear(pages.path)
+    assert pages.get("standings") is None
+    assert elsewhere(pages, "standings") is None
+
+    elsewhere(pages, "standings", b"new")
+    assert pages.get("standings") == b"new"
+    assert elsewhere(pages, "standings") == b"new"
+
+
+def test_full_log_starts_over(pages: SharedPages) -> None:
+    for number in range(100):
+        pages.set(f"page {number}", bytes(100))
+    # The oldest went when it filled up, and the newest are still there
+    assert pages.get("page 0") is None
+    assert elsewhere(pages, "page 99") == bytes(100)
+    assert pages.get("page 99") == bytes(100)
+
+
+def test_workers_write_at_once(tmp_path: Path) -> None:
+    pages = SharedPages(tmp_path / "pages", size=1024 * 1024)
+
+    def work(worker: int) -> None:
+        for number in range(200):
+            pages.set(f"{worker}:{number}", f"page {number} from {worker}".encode())
+
+    workers = [fork.Process(target=work, args=(worker,)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+    for worker in range(4):
+        for number in range(200):
+            assert pages.get(f"{worker}:{number}") == f"page {number} from {worker}".encode()
+
+
+def test_header_is_read_under_the_lock(pages: SharedPages) -> None:
+    pages.set("standings", b"<html>")
+    # Another opening of the file, as a worker in the middle of a clear would have
+    writer = SharedPages(pages.path, size=pages.size)
+    results: list[Optional[bytes]] = []
+    with writer._locked():
+        reader = threading.Thread(target=lambda: results.append(pages.get("standings")))
+        reader.start()
+        reader.join(0.1)
+        assert reader.is_alive()
+    reader.join()
+    assert results == [b"<html>"]
+
+
+def test_publish_clears_the_configured_pages(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "configured"
+    monkeypatch.setenv("FLASK_SHARED_PAGES", str(path))
+    pages = SharedPages(path, size=4096)
+    pages.set("standings", b"old")
+    publish(tmp_path, "standings", 20, "{}")
+    assert pages.get("standings") is None
@@ -0,0 +1,107 @@
+import itertools
+from typing import Optional
+
+import pytest
+
+from bench.fixtures import stream_event
+from models import JSON
+from models.live import StreamData
+from standings.simulate import BRACKET_SIZE, SEASON_LENGTH, simulate
+
+
+def season(remaining: Optional[dict[int, int]] = None, schedule: bool = False) -> StreamData:
+    """Sixteen teams with the season played out, but for the games remaining for some of them"""
+    event = stream_event(teams=16)
+    standings = event["games"]["standings"]
+    team_ids = [team["id"] for team in event["leagues"]["teams"]]
+    for number, team_id in enumerate(team_ids):
+        standings["gamesPlayed"][team_id] = SEASON_LENGTH - (remaining or {}).get(number, 0)
+        standings["wins"][team_id] = min(40 + number % 4, standings["gamesPlayed"][team_id])
+    for game in event["games"]["schedule"] + event["games"]["tomorrowSchedule"]:
+        game["gameComplete"] = not schedule
+    return StreamData.parse_obj(event)
+
+
+def brackets(data: StreamData, wins: dict[str, int]) -> tuple[set[str], set[str]]:
+    """Who makes each bracket if the season ends with these wins"""
+    assert data.leagues
+    index = data.leagues.index
+    tiebreak = index.tiebreakers[data.leagues.leagues[0].tiebreakers]
+    order = {str(team_id): rank for rank, team_id in enumerate(tiebreak.order)}
+
+    def key(team_id: str) -> tuple[int, int]:
+        return wins[team_id], -order[team_id]
+
+    over: set[str] = set()
+    under: set[str] = set()
+    for subleague in index.subleagues.values():
+        divisions = [
+            [str(team_id) for team_id in index.divisions[division].teams]
+            for division in subleague.divisions
+        ]
+        for division in divisions:
+            over.add(max(division, key=key))
+            under.add(min(division, key=key))
+        teams = [team for division in divisions for team in division]
+        rest = sorted((team for team in teams if team not in over | under), key=key)
+        spots = BRACKET_SIZE - len(divisions)
+        over.update(rest[-spots:])
+        under.update(rest[:spots])
+    return over, under
+
+
+def test_finished_season_is_certain() -> None:
+    data = season()
+    assert data.games and data.leagues
+    wins = {str(team_id): won for team_id, won in data.games.standings.wins.items()}
+    over, under = brackets(data, wins)
+    odds = simulate(data.games, data.leagues, simulations=10, seed=0)
+    assert odds.keys() == wins.keys()
+    for team_id, team_odds in odds.items():
+        assert team_odds.overbracket == (team_id in over)
+        assert team_odds.underbracket == (team_id in under)
+        assert team_odds.party == (team_id not in over)
+        assert team_odds.playoffs == team_odds.overbracket + team_odds.underbracket
+
+
+def test_brackets_are_always_full() -> None:
+    data = season(remaining={number: 10 for number in range(16)}, schedule=True)
+    assert data.games and data.leagues
+    odds = simulate(data.games, data.leagues, simulations=500, seed=0)
+    # Every run fills both brackets of both subleagues
+    assert sum(team_odds.overbracket for team_odds in odds.values()) == pytest.approx(2 * BRACKET_SIZE)
+    assert sum(team_odds.underbracket for team_odds in odds.values()) == pytest.approx(2 * BRACKET_SIZE)
+    assert all(team_odds.playoffs <= 1 for team_odds in odds.values())
+
+
+def test_seed_repeats() -> None:
+    data = season(remaining={number: 10 for number in range(16)}, schedule=True)
+    assert data.games and data.leagues
+    first = simulate(data.games, data.leagues, simulations=200, seed=1)
+    assert simulate(data.games, data.leagues, simulations=200, seed=1) == first
+
+
+def test_matches_exact_odds() -> None:
+    # A game left for four teams around the cutoffs, with nothing known about them
+    remaining = {1: 1, 2: 1, 5: 1, 6: 1}
+    data = season(remaining)
+    assert data.games and data.leagues
+    team_ids = [str(team.id) for team in data.leagues.teams]
+    wins = {str(team_id): won for team_id, won in data.games.standings.wins.items()}
+
+    exact = {team_id: [0.0, 0.0] for team_id in team_ids}
+    outcomes = list(itertools.product((0, 1), repeat=len(remaining)))
+    for outcome in outcomes:
+        final: JSON = dict(wins)
+        for number, won in zip(remaining, outcome):
+            final[team_ids[number]] += won
+        over, under = brackets(data, final)
+        for team_id in over:
+            exact[team_id][0] += 1 / len(outcomes)
+        for team_id in under:
+            exact[team_id][1] += 1 / len(outcomes)
+
+    odds = simulate(data.games, data.leagues, simulations=20_000, seed=0)
+    for team_id, (overbracket, underbracket) in exact.items():
+        assert odds[team_id].overbracket == pytest.approx(overbracket, abs=0.02)
+        assert odds[team_id].underbracket == pytest.approx(underbracket, abs=0.02)
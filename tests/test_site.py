@@ -0,0 +1,58 @@
+import json
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from flask.testing import FlaskClient
+
+from party import site
+from party.publish import publish, publish_shards
+
+UPDATED = "2021-06-01T00:00:00+00:00"
+TEAM = {"name": "Tigers", "pitchers": [], "weather": {}, "stadia": {}, "others": {"crabs": {"wins": 1}}}
+
+
+@pytest.fixture
+def client(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[FlaskClient]:
+    monkeypatch.setattr(site, "data_path", tmp_path / "data")
+    site.data_path.mkdir()
+    # What the writers clear, which must be the same as the site's
+    monkeypatch.setenv("FLASK_SHARED_PAGES", str(tmp_path / "pages"))
+    monkeypatch.setitem(site.app.config, "SHARED_PAGES", str(tmp_path / "pages"))
+    site.page_store.cache_clear()
+    site._bundles.clear()
+    yield site.app.test_client()
+    site.page_store.cache_clear()
+
+
+def publish_teams(season_no: int = 20) -> None:
+    bundle = {"updated": UPDATED, "season": season_no, "team_data": {"tigers": TEAM}}
+    publish_shards(site.data_path, "teams", season_no, {
+        "tigers": json.dumps({"updated": UPDATED, "season": season_no, "team": TEAM}),
+    }, json.dumps({"updated": UPDATED, "season": season_no, "teams": {"tigers": "Tigers"}}))
+    publish(site.data_path, "teams", season_no, json.dumps(bundle))
+
+
+@pytest.mark.parametrize("url", ["/standings.json", "/teams.json", "/teams.json?season=3"])
+def test_missing_seasons_are_not_found(client: FlaskClient, url: str) -> None:
+    assert client.get(url).status_code == 404
+
+
+def test_data_files(client: FlaskClient) -> None:
+    publish_teams()
+    response = client.get("/teams.json")
+    assert response.status_code == 200
+    assert response.json and response.json["team_data"] == {"tigers": TEAM}
+    assert client.get("/teams.json", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+    assert client.get("/teams/tigers/record.json").json == {"updated": UPDATED, "season": 20, "team": TEAM}
+    assert client.get("/teams/tigers/others/crabs.json").json == {"wins": 1}
+    assert client.get("/teams/lions/record.json").status_code == 404
+
+
+def test_team_index(client: FlaskClient) -> None:
+    publish_teams()
+    assert client.get("/teams/index.json").json == {"updated": UPDATED, "season": 20, "teams": {"tigers": "Tigers"}}
+    # Not a team, however the files are laid out
+    assert client.get("/teams/index").status_code == 404
+    assert client.get("/teams/index/record.json").status_code == 404
+    assert client.get("/teams/index/pitchers.json").status_code == 404